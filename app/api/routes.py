@@ -1,11 +1,18 @@
 import asyncio
+import hashlib
 import logging
+import os
+import stat
 from pathlib import Path
+from typing import Annotated
 
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, ORJSONResponse
 from fastapi.templating import Jinja2Templates
+from pydantic import BeforeValidator, EmailStr
 
+from config import settings
 from app.api.schemas import (
     FormatResponse,
     FormattingWarning,
@@ -13,21 +20,71 @@ from app.api.schemas import (
     JournalListResponse,
 )
 from app.core.pipeline import list_journals, load_journal_config, run_pipeline
-from app.services.file_service import cleanup_files, get_output_path, save_upload
+from app.services.email_service import send_formatted_document
+from app.services.file_service import (
+    ALLOWED_EXTENSIONS,
+    cleanup_files,
+    get_output_path,
+    save_upload,
+    validate_upload,
+)
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
-templates = Jinja2Templates(directory=Path(__file__).parent.parent / "templates")
+router = APIRouter(default_response_class=ORJSONResponse)
+# Compiled templates stay in the in-memory cache; auto-reload (a stat per
+# render) is only enabled when TEMPLATE_AUTO_RELOAD is set for development.
+templates = Jinja2Templates(
+    env=Environment(
+        loader=FileSystemLoader(Path(__file__).parent.parent / "templates"),
+        autoescape=select_autoescape(["html"]),
+        auto_reload=settings.template_auto_reload,
+        cache_size=400,
+    )
+)
+
+
+STATIC_DIR = Path(__file__).parent.parent / "static"
+
+
+def _static_version() -> str:
+    """Return a short content hash of the files under ``STATIC_DIR``."""
+    digest = hashlib.sha1()
+    for path in sorted(STATIC_DIR.iterdir()):
+        if path.is_file():
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:10]
+
+
+# Appended to static asset URLs as ``?v=``, so browsers can cache the
+# assets indefinitely and still fetch new ones after a deploy.
+STATIC_VERSION = _static_version()
+
+
+def _blank_to_none(value):
+    """Map an empty or whitespace-only form value to ``None``."""
+    if isinstance(value, str):
+        return value.strip() or None
+    return value
+
+
+# HTML forms submit an untouched optional input as an empty string; treat
+# that as "no address" rather than rejecting it as an invalid one.
+OptionalEmail = Annotated[EmailStr | None, BeforeValidator(_blank_to_none)]
 
 
 @router.get("/", response_class=HTMLResponse)
 async def index(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return templates.TemplateResponse(
+        "index.html", {"request": request, "static_version": STATIC_VERSION}
+    )
 
 
+# Plain ``def`` handlers: FastAPI runs them in its threadpool, so cold-cache
+# config reads and directory scans never block the event loop.
 @router.get("/api/journals", response_model=JournalListResponse)
-async def get_journals():
+def get_journals():
     journals = list_journals()
     return JournalListResponse(
         journals=[JournalInfo(**j) for j in journals]
@@ -35,7 +92,7 @@ async def get_journals():
 
 
 @router.get("/api/journals/{journal_id}")
-async def get_journal_config(journal_id: str):
+def get_journal_config(journal_id: str):
     try:
         config = load_journal_config(journal_id)
         return config
@@ -47,15 +104,19 @@ async def get_journal_config(journal_id: str):
 async def format_manuscript(
     file: UploadFile = File(...),
     journal_id: str = Form(...),
+    email: Annotated[OptionalEmail, Form()] = None,
 ):
     # Validate file extension
     if not file.filename:
         raise HTTPException(status_code=400, detail="No file provided")
 
     ext = Path(file.filename).suffix.lower()
-    if ext not in (".doc", ".docx"):
+    if ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(status_code=400, detail="Only .doc and .docx files are accepted")
 
+    # Reject oversized or non-Word content before writing anything to disk
+    await validate_upload(file)
+
     # Save upload
     upload_path = await save_upload(file)
     output_path = get_output_path(file.filename)
@@ -80,6 +141,21 @@ async def format_manuscript(
                 stats=result.stats,
             )
 
+        # Optionally email the result when the deployment has SMTP enabled.
+        if settings.enable_email and email:
+            try:
+                await send_formatted_document(
+                    email, file.filename, result.output_path, result.warnings
+                )
+            except Exception as e:
+                logger.error(f"Email delivery failed: {e}")
+                fmt_warnings.append(
+                    FormattingWarning(
+                        step="email",
+                        message="Could not email the formatted document; please download it below.",
+                    )
+                )
+
         # Build download URL from output filename
         output_filename = Path(result.output_path).name
         download_url = f"/api/download/{output_filename}"
@@ -97,7 +173,8 @@ async def format_manuscript(
         raise HTTPException(status_code=500, detail=str(e))
 
     finally:
-        cleanup_files(upload_path)
+        # Unlinking a large upload can block; keep it off the event loop.
+        await asyncio.to_thread(cleanup_files, upload_path)
 
 
 @router.get("/api/download/{filename}")
@@ -106,14 +183,20 @@ async def download_file(filename: str):
     if ".." in filename or "/" in filename or "\\" in filename:
         raise HTTPException(status_code=400, detail="Invalid filename")
 
-    output_dir = Path("output")
-    file_path = output_dir / filename
+    file_path = os.path.join(settings.output_dir, filename)
 
-    if not file_path.exists() or not file_path.is_file():
+    # One stat serves both the existence check and FileResponse's
+    # Content-Length/ETag headers (Range requests are handled by Starlette).
+    try:
+        stat_result = os.stat(file_path)
+    except OSError:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not stat.S_ISREG(stat_result.st_mode):
         raise HTTPException(status_code=404, detail="File not found")
 
     return FileResponse(
-        path=str(file_path),
+        path=file_path,
         filename=filename,
+        stat_result=stat_result,
         media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
     )
@@ -1,35 +1,179 @@
-"""Convert legacy .doc files to .docx format using LibreOffice headless."""
+"""Convert legacy .doc files to .docx format using LibreOffice headless.
 
+When ``settings.use_unoserver`` is enabled a single LibreOffice instance is
+kept running behind an ``unoserver`` listener and conversions are sent to it
+with ``unoconvert``, avoiding the multi-second ``soffice`` cold start on every
+request.  If the listener is unavailable the one-shot ``soffice`` path is used.
+"""
+
+import logging
+import shutil
+import socket
 import subprocess
+import threading
+import time
 from pathlib import Path
 
+from config import settings
 
-def convert_doc_to_docx(doc_path: str) -> str:
-    """Convert a .doc file to .docx using LibreOffice headless mode.
+logger = logging.getLogger(__name__)
 
-    If the file already has a .docx extension, it is returned as-is.
+_CONVERSION_TIMEOUT = 60
 
-    Args:
-        doc_path: Path to the input .doc or .docx file.
+# How long a freshly spawned listener gets to start accepting connections.
+_LISTENER_STARTUP_TIMEOUT = 10
+_PORT_POLL_INTERVAL = 0.1
+
+# Resolved once at import; ``None`` when unoserver is not installed.
+_UNOSERVER = shutil.which("unoserver")
+_UNOCONVERT = shutil.which("unoconvert")
+
+_listener: subprocess.Popen | None = None
+_listener_lock = threading.Lock()
+_missing_warned = False
+
+
+def _decode_stderr(result: subprocess.CompletedProcess) -> str:
+    """Decode captured stderr bytes; only needed on the failure path."""
+    return result.stderr.decode("utf-8", "replace").strip()
+
+
+def _wait_for_listener(process: subprocess.Popen) -> bool:
+    """Wait until *process* accepts connections on ``unoserver_port``.
+
+    Gives up after ``_LISTENER_STARTUP_TIMEOUT`` seconds or as soon as the
+    process exits.
+    """
+    deadline = time.monotonic() + _LISTENER_STARTUP_TIMEOUT
+    address = (settings.unoserver_host, settings.unoserver_port)
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            with socket.create_connection(address, timeout=_PORT_POLL_INTERVAL):
+                return True
+        except OSError:
+            time.sleep(_PORT_POLL_INTERVAL)
+    return False
+
+
+def _terminate(process: subprocess.Popen) -> None:
+    """Stop *process*, killing it if it does not exit within 10 seconds."""
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def start_listener() -> bool:
+    """Spawn the persistent ``unoserver`` listener if it is not already running.
+
+    A freshly spawned listener is only reported as running once it accepts
+    connections; if it does not within ``_LISTENER_STARTUP_TIMEOUT`` it is
+    stopped again, so the ``soffice`` fallback never competes with its
+    LibreOffice instance for the user profile.
 
     Returns:
-        Path to the .docx file (original or newly converted).
+        ``True`` if a listener is accepting connections, ``False`` if
+        ``unoserver``/``unoconvert`` are not installed or the listener could
+        not be started.
+    """
+    global _listener, _missing_warned
 
-    Raises:
-        FileNotFoundError: If the input file does not exist.
-        RuntimeError: If the LibreOffice conversion fails or times out.
+    with _listener_lock:
+        if _listener is not None and _listener.poll() is None:
+            return True
+
+        if _UNOSERVER is None or _UNOCONVERT is None:
+            if not _missing_warned:
+                logger.warning(
+                    "unoserver/unoconvert not found; falling back to per-request soffice"
+                )
+                _missing_warned = True
+            return False
+
+        try:
+            _listener = subprocess.Popen(
+                [
+                    _UNOSERVER,
+                    "--interface",
+                    settings.unoserver_host,
+                    "--port",
+                    str(settings.unoserver_port),
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as exc:
+            logger.warning(f"Could not start unoserver: {exc}")
+            _listener = None
+            return False
+
+        if not _wait_for_listener(_listener):
+            logger.warning(
+                f"unoserver did not accept connections within "
+                f"{_LISTENER_STARTUP_TIMEOUT} seconds; falling back to soffice"
+            )
+            _terminate(_listener)
+            _listener = None
+            return False
+
+        return True
+
+
+def stop_listener() -> None:
+    """Terminate the persistent ``unoserver`` listener, if one was started."""
+    global _listener
+
+    with _listener_lock:
+        if _listener is None:
+            return
+        _terminate(_listener)
+        _listener = None
+
+
+def _convert_via_listener(path: Path, converted_path: Path) -> bool:
+    """Convert *path* through the running listener, respawning it if it died.
+
+    Returns ``True`` on success and ``False`` if the caller should fall back
+    to a one-shot ``soffice`` conversion.
     """
-    path = Path(doc_path)
+    if not start_listener():
+        return False
 
-    if not path.exists():
-        raise FileNotFoundError(f"Input file not found: {doc_path}")
+    try:
+        result = subprocess.run(
+            [
+                _UNOCONVERT,
+                "--host",
+                settings.unoserver_host,
+                "--port",
+                str(settings.unoserver_port),
+                "--convert-to",
+                "docx",
+                str(path),
+                str(converted_path),
+            ],
+            timeout=_CONVERSION_TIMEOUT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+    except subprocess.TimeoutExpired:
+        logger.warning(f"unoconvert timed out for {path}; retrying with soffice")
+        return False
 
-    # Already .docx — nothing to do
-    if path.suffix.lower() == ".docx":
-        return str(path)
+    if result.returncode != 0:
+        logger.warning(
+            f"unoconvert failed (exit code {result.returncode}): {_decode_stderr(result)}"
+        )
+        return False
+
+    return converted_path.exists()
 
-    output_dir = str(path.parent)
 
+def _convert_via_soffice(path: Path, output_dir: str) -> None:
+    """Convert *path* by cold-starting ``soffice --headless``."""
     try:
         result = subprocess.run(
             [
@@ -41,23 +185,52 @@ def convert_doc_to_docx(doc_path: str) -> str:
                 output_dir,
                 str(path),
             ],
-            timeout=60,
-            capture_output=True,
-            text=True,
+            timeout=_CONVERSION_TIMEOUT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
         )
     except subprocess.TimeoutExpired as exc:
         raise RuntimeError(
-            f"LibreOffice conversion timed out after 60 seconds for: {doc_path}"
+            f"LibreOffice conversion timed out after {_CONVERSION_TIMEOUT} seconds for: {path}"
         ) from exc
 
     if result.returncode != 0:
         raise RuntimeError(
             f"LibreOffice conversion failed (exit code {result.returncode}): "
-            f"{result.stderr.strip()}"
+            f"{_decode_stderr(result)}"
         )
 
+
+def convert_doc_to_docx(doc_path: str) -> str:
+    """Convert a .doc file to .docx using LibreOffice headless mode.
+
+    If the file already has a .docx extension, it is returned as-is.
+
+    Args:
+        doc_path: Path to the input .doc or .docx file.
+
+    Returns:
+        Path to the .docx file (original or newly converted).
+
+    Raises:
+        FileNotFoundError: If the input file does not exist.
+        RuntimeError: If the LibreOffice conversion fails or times out.
+    """
+    path = Path(doc_path)
+
+    if not path.exists():
+        raise FileNotFoundError(f"Input file not found: {doc_path}")
+
+    # Already .docx — nothing to do
+    if path.suffix.lower() == ".docx":
+        return str(path)
+
+    output_dir = str(path.parent)
     converted_path = Path(output_dir) / (path.stem + ".docx")
 
+    if not (settings.use_unoserver and _convert_via_listener(path, converted_path)):
+        _convert_via_soffice(path, output_dir)
+
     if not converted_path.exists():
         raise RuntimeError(
             f"Conversion appeared to succeed but output file not found: {converted_path}"
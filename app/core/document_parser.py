@@ -3,16 +3,30 @@
 from __future__ import annotations
 
 import re
+import weakref
+from dataclasses import dataclass
+from functools import cached_property
+
 from docx.document import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml.ns import nsmap, qn
+from lxml import etree
+
+
+# Leading heading number such as "1. ", "1.2) ", "1.2.3. ".
+_HEADING_NUM_RE = re.compile(r"^\d+(?:\.\d+)*[\.\)]\s*")
+
+# Built-in heading style names: "Heading 1", "Heading 2", ...
+_HEADING_STYLE_RE = re.compile(r"^Heading\s+(\d+)$")
 
 
 def strip_heading_number(text: str) -> str:
     """Strip leading number prefixes like '1. ', '1.2 ', '1.2.3 ' from heading text."""
-    return re.sub(r"^\d+(?:\.\d+)*[\.\)]\s*", "", text.strip())
+    return _HEADING_NUM_RE.sub("", text.strip())
 
 
 # Common reference-section heading variants (lowercase for comparison).
-_REFERENCE_HEADINGS = {
+_REFERENCE_HEADINGS = frozenset({
     "references",
     "bibliography",
     "works cited",
@@ -21,7 +35,79 @@ _REFERENCE_HEADINGS = {
     "reference list",
     "cited literature",
     "literature references",
-}
+})
+
+
+# Resolved style names per document part, keyed by the paragraph's raw
+# ``w:pStyle`` id (``None`` for the default paragraph style).  Styles are
+# never added or renamed while a document is being formatted, so the
+# mapping stays valid for the lifetime of the part.
+_STYLE_NAME_CACHE: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+_W_P = qn("w:p")
+
+
+def _resolve_style_name(part, style_id: str | None) -> str:
+    """Return the paragraph style name for *style_id* in *part*, memoised."""
+    names = _STYLE_NAME_CACHE.get(part)
+    if names is None:
+        names = _STYLE_NAME_CACHE[part] = {}
+    try:
+        return names[style_id]
+    except KeyError:
+        style = part.get_style(style_id, WD_STYLE_TYPE.PARAGRAPH)
+        name = names[style_id] = style.name or ""
+        return name
+
+
+def get_style_name(paragraph) -> str:
+    """Return the style name of *paragraph*, memoised per style id.
+
+    ``paragraph.style.name`` looks the style up in the styles part on every
+    access; this resolves each distinct style id only once per document.
+
+    Args:
+        paragraph: A ``docx.text.paragraph.Paragraph`` instance.
+
+    Returns:
+        The style name, or ``""`` if the style has no name.
+    """
+    return _resolve_style_name(paragraph.part, paragraph._p.style)
+
+
+def paragraph_style_ids(doc: Document) -> list[str | None]:
+    """Return the raw ``w:pStyle`` id of every body paragraph.
+
+    The ids are collected with a single XPath query and aligned with
+    ``doc.paragraphs``; paragraphs without an explicit style map to
+    ``None``.
+
+    Args:
+        doc: A ``python-docx`` ``Document`` instance.
+
+    Returns:
+        A list with one style id (or ``None``) per body paragraph.
+    """
+    body = doc.element.body
+    styled = {
+        style_id.getparent().getparent().getparent(): str(style_id)
+        for style_id in body.xpath("./w:p/w:pPr/w:pStyle/@w:val")
+    }
+    return [styled.get(p) for p in body.iterchildren(_W_P)]
+
+
+def paragraph_style_names(doc: Document) -> list[str]:
+    """Return the style name of every body paragraph, aligned with ``doc.paragraphs``.
+
+    Args:
+        doc: A ``python-docx`` ``Document`` instance.
+
+    Returns:
+        A list with one style name per body paragraph (``""`` if unnamed).
+    """
+    part = doc.part
+    return [_resolve_style_name(part, style_id) for style_id in paragraph_style_ids(doc)]
 
 
 def get_heading_level(paragraph) -> int | None:
@@ -37,8 +123,31 @@ def get_heading_level(paragraph) -> int | None:
         The heading level as an integer, or ``None`` if the paragraph
         is not styled as a heading.
     """
-    style_name = paragraph.style.name or ""
-    match = re.match(r"^Heading\s+(\d+)$", style_name)
+    return _heading_level_from_style(get_style_name(paragraph))
+
+
+def paragraph_heading_levels(doc: Document) -> list[int | None]:
+    """Return the heading level of every body paragraph, aligned with ``doc.paragraphs``.
+
+    Args:
+        doc: A ``python-docx`` ``Document`` instance.
+
+    Returns:
+        A list with one entry per body paragraph: the heading level, or
+        ``None`` for non-heading paragraphs.
+    """
+    return [_heading_level_from_style(name) for name in paragraph_style_names(doc)]
+
+
+def _heading_level_from_style(style_name: str) -> int | None:
+    """Return the heading level encoded in *style_name*, or ``None``."""
+    # Cheap prefix test first so body styles never reach the regex engine.
+    if not style_name.startswith("Heading"):
+        return None
+    # Common case "Heading N" with a single digit needs no regex at all.
+    if len(style_name) == 9 and style_name[7] == " " and style_name[8] in "0123456789":
+        return int(style_name[8])
+    match = _HEADING_STYLE_RE.match(style_name)
     if match:
         return int(match.group(1))
     return None
@@ -56,6 +165,31 @@ def merge_paragraph_runs(paragraph) -> str:
     return "".join(run.text for run in paragraph.runs)
 
 
+def replace_paragraph_text(paragraph, new_text: str) -> None:
+    """Replace the text of *paragraph* with *new_text*.
+
+    Writes *new_text* into the first run, preserving its character
+    formatting, and removes the remaining runs.  A paragraph without runs
+    has its content replaced through ``paragraph.text``.
+
+    Args:
+        paragraph: A ``docx.text.paragraph.Paragraph`` instance.
+        new_text: The replacement text.
+    """
+    runs = paragraph.runs
+    if not runs:
+        paragraph.text = new_text
+        return
+
+    runs[0].text = new_text
+
+    # Drop the remaining runs; blanking them would leave empty <w:r>
+    # elements behind for the serializer.
+    p = paragraph._p
+    for run in runs[1:]:
+        p.remove(run._r)
+
+
 def is_reference_heading(text: str) -> bool:
     """Check whether *text* matches a common reference-section heading.
 
@@ -68,10 +202,15 @@ def is_reference_heading(text: str) -> bool:
     Returns:
         ``True`` if *text* is a recognised reference heading.
     """
-    return strip_heading_number(text).lower() in _REFERENCE_HEADINGS
+    # Lower-casing first is safe: the number prefix is digits and punctuation.
+    return strip_heading_number(text.lower()) in _REFERENCE_HEADINGS
 
 
-def get_all_sections(doc: Document) -> list[dict]:
+def get_all_sections(
+    doc: Document,
+    paragraphs: list | None = None,
+    style_names: list[str] | None = None,
+) -> list[dict]:
     """Return metadata for every headed section in the document.
 
     Each entry is a dict with:
@@ -84,35 +223,47 @@ def get_all_sections(doc: Document) -> list[dict]:
 
     Args:
         doc: A ``python-docx`` ``Document`` instance.
+        paragraphs: ``doc.paragraphs`` if the caller already has it;
+            avoids rebuilding the paragraph wrappers.
+        style_names: ``paragraph_style_names(doc)`` if the caller already
+            has it.
 
     Returns:
         A list of section dicts ordered by their position in the
         document.
     """
-    paragraphs = doc.paragraphs
+    if paragraphs is None:
+        paragraphs = doc.paragraphs
+    if style_names is None:
+        style_names = paragraph_style_names(doc)
+    total = len(paragraphs)
     sections: list[dict] = []
 
-    for idx, para in enumerate(paragraphs):
-        level = get_heading_level(para)
+    for idx, style_name in enumerate(style_names):
+        level = _heading_level_from_style(style_name)
         if level is not None:
+            para = paragraphs[idx]
+            # Each section ends where the next one starts; back-patch the
+            # previous entry instead of making a second pass.
+            if sections:
+                sections[-1]["end"] = idx
             sections.append(
                 {
                     "heading": para.text,
                     "level": level,
                     "start": idx,
-                    "end": len(paragraphs),  # placeholder; patched below
+                    "end": total,
                 }
             )
 
-    # Patch each section's end to be the start of the next section.
-    for i in range(len(sections) - 1):
-        sections[i]["end"] = sections[i + 1]["start"]
-
     return sections
 
 
 def find_section_by_heading(
-    doc: Document, heading_texts: list[str]
+    doc: Document,
+    heading_texts: list[str],
+    paragraphs: list | None = None,
+    style_names: list[str] | None = None,
 ) -> tuple[int, int] | None:
     """Find the paragraph index range for a section identified by heading text.
 
@@ -122,6 +273,9 @@ def find_section_by_heading(
     Args:
         doc: A ``python-docx`` ``Document`` instance.
         heading_texts: One or more heading strings to look for.
+        paragraphs: ``doc.paragraphs`` if the caller already has it.
+        style_names: ``paragraph_style_names(doc)`` if the caller already
+            has it.
 
     Returns:
         A ``(start_idx, end_idx)`` tuple where *start_idx* is the index
@@ -130,8 +284,8 @@ def find_section_by_heading(
         end of the document).  Returns ``None`` if no matching heading
         is found.
     """
-    normalised = {t.strip().lower() for t in heading_texts}
-    sections = get_all_sections(doc)
+    normalised = frozenset(t.strip().lower() for t in heading_texts)
+    sections = get_all_sections(doc, paragraphs, style_names)
 
     for section in sections:
         heading_text = strip_heading_number(section["heading"]).lower()
@@ -139,3 +293,101 @@ def find_section_by_heading(
             return (section["start"], section["end"])
 
     return None
+
+
+# Body paragraphs containing Office Math (m:oMath / m:oMathPara) anywhere
+# below them, and footnote references inside body-paragraph runs, in
+# document order.
+_MARKERS_XPATH = etree.XPath(
+    "./w:p[.//m:oMath or .//m:oMathPara] | ./w:p/w:r//w:footnoteReference",
+    namespaces={"w": nsmap["w"], "m": nsmap["m"]},
+)
+
+_W_ID = qn("w:id")
+
+
+@dataclass
+class FormatterContext:
+    """Paragraph and section views of a document, shared across formatters.
+
+    ``doc.paragraphs`` and ``doc.sections`` build fresh wrapper objects on
+    every access, and ``paragraph.style.name`` resolves the style through
+    the styles part each time.  The pipeline builds one context per
+    document and hands it to every formatter instead.
+
+    The lists stay valid as long as no paragraph is added, removed or
+    restyled; formatters only change text, runs and paragraph formatting.
+
+    Attributes:
+        paragraphs: ``doc.paragraphs``.
+        style_names: Style name of each paragraph (``""`` if unnamed).
+        heading_levels: Heading level of each paragraph, or ``None``.
+        sections: ``doc.sections`` as a list.
+        body: The ``w:body`` element.
+    """
+
+    paragraphs: list
+    style_names: list[str]
+    heading_levels: list[int | None]
+    sections: list
+    body: object
+
+    @classmethod
+    def from_document(cls, doc: Document) -> FormatterContext:
+        """Build the context for *doc*."""
+        style_names = paragraph_style_names(doc)
+        return cls(
+            paragraphs=doc.paragraphs,
+            style_names=style_names,
+            heading_levels=[_heading_level_from_style(name) for name in style_names],
+            sections=list(doc.sections),
+            body=doc.element.body,
+        )
+
+    @cached_property
+    def body_paragraphs(self) -> list[tuple[int, object]]:
+        """``(index, paragraph)`` for every paragraph not styled as a heading.
+
+        Filtered once per context on the resolved style names, so the
+        formatters that skip headings share one list.
+        """
+        return [
+            (idx, paragraph)
+            for idx, (paragraph, style_name) in enumerate(
+                zip(self.paragraphs, self.style_names)
+            )
+            if not style_name.startswith("Heading")
+        ]
+
+    @cached_property
+    def _xml_markers(self) -> tuple[set[int], list[dict]]:
+        """Equation paragraphs and footnote references from one XPath query."""
+        para_index = {paragraph._p: idx for idx, paragraph in enumerate(self.paragraphs)}
+        omath: set[int] = set()
+        footnotes: list[dict] = []
+
+        for element in _MARKERS_XPATH(self.body):
+            if element.tag == _W_P:
+                omath.add(para_index[element])
+                continue
+            # Climb to the enclosing body paragraph (the reference may sit
+            # in nested content such as a text box inside the run).
+            p = element.getparent()
+            while p not in para_index:
+                p = p.getparent()
+            footnotes.append({
+                "id": element.get(_W_ID, "unknown"),
+                "para_idx": para_index[p],
+            })
+
+        return omath, footnotes
+
+    @property
+    def omath_paragraphs(self) -> set[int]:
+        """Indices of paragraphs containing Office Math equation objects."""
+        return self._xml_markers[0]
+
+    @property
+    def footnote_references(self) -> list[dict]:
+        """Footnote references (``id``, ``para_idx``) in document order."""
+        return self._xml_markers[1]
@@ -0,0 +1,108 @@
+"""Save python-docx documents without re-deflating already-compressed media.
+
+``Document.save`` deflates every part of the package, including images that
+are already PNG/JPEG-compressed and typically make up most of a manuscript's
+bytes.  :func:`save_document` writes the same package but stores those parts
+uncompressed, skipping the wasted deflate pass.
+
+The package is written through python-docx's private ``PackageWriter``
+helpers (``_write_content_types_stream``, ``_write_pkg_rels`` and
+``_write_parts``), as found in python-docx 1.1.2, the version pinned in
+``requirements.txt``.  If a later release changes them, the resulting
+``AttributeError``/``TypeError`` is caught and saving falls back to
+``doc.save``, so output is never lost to an upgrade.
+"""
+
+from __future__ import annotations
+
+import logging
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+from docx.opc.pkgwriter import PackageWriter
+
+logger = logging.getLogger(__name__)
+
+# Content types whose payload is already compressed; deflating them again
+# costs CPU for no size benefit.
+_PRECOMPRESSED_CONTENT_TYPES = frozenset({
+    "image/png",
+    "image/jpeg",
+    "image/gif",
+    "image/webp",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+})
+
+
+# Cleared the first time the private PackageWriter helpers fail, so later
+# saves go straight to ``doc.save``.
+_selective_save_supported = True
+
+
+class _SelectiveZipWriter:
+    """Physical package writer that stores selected members uncompressed.
+
+    Implements the ``write``/``close`` interface python-docx's
+    ``PackageWriter`` expects from a physical writer.
+    """
+
+    def __init__(self, pkg_file, stored_members: frozenset[str]):
+        self._zipf = ZipFile(pkg_file, "w", compression=ZIP_DEFLATED)
+        self._stored_members = stored_members
+
+    def write(self, pack_uri, blob: bytes) -> None:
+        membername = pack_uri.membername
+        compress_type = ZIP_STORED if membername in self._stored_members else ZIP_DEFLATED
+        self._zipf.writestr(membername, blob, compress_type=compress_type)
+
+    def close(self) -> None:
+        self._zipf.close()
+
+
+def save_document(doc, path: str) -> None:
+    """Save *doc* to *path*, storing already-compressed parts as-is.
+
+    Produces the same package as ``doc.save(path)``; only the zip
+    compression of media parts differs.  Falls back to ``doc.save(path)``
+    if python-docx's private package-writing helpers are not as expected.
+
+    Args:
+        doc: A python-docx ``Document`` object.
+        path: Destination file path.
+    """
+    global _selective_save_supported
+    if _selective_save_supported:
+        try:
+            _write_selective(doc, path)
+            return
+        except (AttributeError, TypeError):
+            _selective_save_supported = False
+            logger.warning(
+                "python-docx package writer API changed; saving documents "
+                "with Document.save instead",
+                exc_info=True,
+            )
+    doc.save(path)
+
+
+def _write_selective(doc, path: str) -> None:
+    """Write *doc*'s package to *path* through ``_SelectiveZipWriter``."""
+    package = doc.part.package
+    parts = package.parts
+    for part in parts:
+        part.before_marshal()
+
+    stored_members = frozenset(
+        part.partname.membername
+        for part in parts
+        if part.content_type in _PRECOMPRESSED_CONTENT_TYPES
+    )
+
+    writer = _SelectiveZipWriter(path, stored_members)
+    try:
+        PackageWriter._write_content_types_stream(writer, parts)
+        PackageWriter._write_pkg_rels(writer, package.rels)
+        PackageWriter._write_parts(writer, parts)
+    finally:
+        writer.close()
@@ -1,13 +1,18 @@
-import json
+import functools
 import logging
-from pathlib import Path
+import os
+from types import MappingProxyType
+from typing import Any, Mapping
+
+import orjson
 from docx import Document
 
 from config import settings
 from app.api.schemas import FormattingResult, FormattingStats
 from app.core.doc_converter import convert_doc_to_docx
-from app.formatters.layout import apply_layout
-from app.formatters.fonts import apply_fonts
+from app.core.document_parser import FormatterContext
+from app.core.docx_writer import save_document
+from app.formatters.body import apply_layout_and_fonts
 from app.formatters.footnotes import apply_footnotes
 from app.formatters.headings import apply_headings
 from app.formatters.title_page import apply_title_page
@@ -23,36 +28,132 @@ from app.formatters.equations import apply_equations
 
 logger = logging.getLogger(__name__)
 
-def load_journal_config(journal_id: str) -> dict:
-    config_path = Path(settings.journal_config_dir) / f"{journal_id}.json"
-    if not config_path.exists():
-        raise FileNotFoundError(f"Journal config not found: {journal_id}")
-    with open(config_path, "r") as f:
-        return json.load(f)
+def _freeze(value: Any) -> Any:
+    """Recursively make parsed JSON read-only: dicts become ``MappingProxyType``, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
 
-def list_journals() -> list[dict]:
-    config_dir = Path(settings.journal_config_dir)
+@functools.lru_cache(maxsize=128)
+def _load_cached(path: str, mtime_ns: int) -> Mapping[str, Any]:
+    """Parse a journal config file once per (path, mtime) pair.
+
+    Keying on the modification time means an edited config is picked up
+    on the next request without restarting the server.  The cached config
+    is shared by every request, so it is frozen all the way down: nested
+    objects are read-only mappings and arrays are tuples.
+    """
+    with open(path, "rb") as f:
+        return _freeze(orjson.loads(f.read()))
+
+def load_journal_config(journal_id: str) -> Mapping[str, Any]:
+    config_path = os.path.join(settings.journal_config_dir, f"{journal_id}.json")
+    try:
+        mtime_ns = os.stat(config_path).st_mtime_ns
+    except OSError:
+        raise FileNotFoundError(f"Journal config not found: {journal_id}") from None
+    return _load_cached(config_path, mtime_ns)
+
+def _config_files(config_dir: str) -> tuple[tuple[str, int], ...]:
+    """Return ``(filename, mtime_ns)`` for every ``.json`` file in *config_dir*, sorted."""
+    with os.scandir(config_dir) as entries:
+        return tuple(sorted(
+            (e.name, e.stat().st_mtime_ns)
+            for e in entries
+            if e.name.endswith(".json") and e.is_file()
+        ))
+
+@functools.lru_cache(maxsize=8)
+def _journal_manifest(
+    config_dir: str, config_files: tuple[tuple[str, int], ...]
+) -> tuple[dict, ...]:
+    """Build the ``id``/``name``/``description`` index for *config_dir*.
+
+    Cached on the name and modification time of every config file (see
+    ``_config_files``), so adding, removing or editing a file in place
+    all rebuild the index.  Checking the key costs one stat per file; no
+    file is opened or parsed unless it changed.
+    """
     journals = []
-    for config_file in sorted(config_dir.glob("*.json")):
-        with open(config_file, "r") as f:
-            config = json.load(f)
+    for name, mtime_ns in config_files:
+        stem = name[: -len(".json")]
+        config = _load_cached(os.path.join(config_dir, name), mtime_ns)
         journals.append({
-            "id": config_file.stem,
-            "name": config.get("name", config_file.stem),
+            "id": stem,
+            "name": config.get("name", stem),
             "description": config.get("description", "")
         })
-    return journals
+    return tuple(journals)
+
+def list_journals() -> list[dict]:
+    config_dir = settings.journal_config_dir
+    manifest = _journal_manifest(config_dir, _config_files(config_dir))
+    return [dict(journal) for journal in manifest]
+
+# Formatter steps and the steps each one must run after.
+# Content-detecting steps (title_page, abstract, keywords, sections,
+# citations, references) must run BEFORE headings numbering, because
+# numbering prepends prefixes like "1. " that break heading-text matching.
+# Appendix runs AFTER headings (needs final heading format).  Steps that
+# set run font sizes run after fonts so their sizes win over the body size.
+# Layout and body fonts share a single paragraph pass ("layout_fonts").
+_PIPELINE_STEPS = (
+    ("layout_fonts", apply_layout_and_fonts, ()),
+    ("footnotes", apply_footnotes, ()),
+    ("title_page", apply_title_page, ("layout_fonts",)),
+    ("abstract", apply_abstract, ("layout_fonts",)),
+    ("keywords", apply_keywords, ("layout_fonts",)),
+    ("sections", apply_section_order, ()),
+    ("citations", apply_citations, ()),
+    ("references", apply_references, ("layout_fonts",)),
+    ("headings", apply_headings, (
+        "layout_fonts", "title_page", "abstract", "keywords",
+        "sections", "citations", "references",
+    )),
+    ("appendix", apply_appendix, ("headings",)),
+    ("tables", apply_tables, ()),
+    ("figures", apply_figures, ("layout_fonts",)),
+    ("equations", apply_equations, ("layout_fonts",)),
+)
+
+def _resolve_step_order(steps) -> list[tuple]:
+    """Topologically sort *steps*, keeping declaration order among ready steps.
+
+    Raises:
+        ValueError: If a step depends on an unknown step or the
+            dependencies contain a cycle.
+    """
+    names = {name for name, _, _ in steps}
+    for name, _, depends_on in steps:
+        unknown = set(depends_on) - names
+        if unknown:
+            raise ValueError(f"Step '{name}' depends on unknown steps: {sorted(unknown)}")
+
+    done: set[str] = set()
+    pending = list(steps)
+    order = []
+    while pending:
+        for i, (name, fn, depends_on) in enumerate(pending):
+            if done.issuperset(depends_on):
+                order.append((name, fn))
+                done.add(name)
+                del pending[i]
+                break
+        else:
+            raise ValueError(
+                f"Cyclic step dependencies among: {[name for name, _, _ in pending]}"
+            )
+    return order
+
+_STEP_ORDER = _resolve_step_order(_PIPELINE_STEPS)
 
 def run_pipeline(input_path: str, journal_id: str, output_path: str) -> FormattingResult:
     warnings = []
     errors = []
-    stats = FormattingStats(
-        citations_found=0, citations_reformatted=0,
-        references_found=0, references_reformatted=0,
-        tables_found=0, figures_found=0, equations_found=0,
-        footnotes_found=0, abstract_word_count=0,
-        keywords_count=0, appendices_found=0
-    )
+    # Accumulate into a plain dict; the model is only built once at the end.
+    stats = dict.fromkeys(FormattingStats.model_fields, 0)
 
     try:
         # Convert .doc if needed
@@ -63,54 +164,34 @@ def run_pipeline(input_path: str, journal_id: str, output_path: str) -> Formatti
 
         # Load document
         doc = Document(docx_path)
+        # Paragraph/section wrappers and style names, built once and shared
+        # by every step (no step adds, removes or restyles paragraphs).
+        ctx = FormatterContext.from_document(doc)
 
-        # Run each formatter step, catching per-step errors.
-        # Order matters: content-detecting steps (title_page, abstract,
-        # keywords, sections, citations, references, appendix) must run
-        # BEFORE headings numbering, because numbering prepends prefixes
-        # like "1. " that break heading-text matching.
-        # Footnotes runs early (can appear anywhere in document).
-        # Appendix runs AFTER headings (needs final heading format).
-        steps = [
-            ("layout", lambda: apply_layout(doc, config)),
-            ("fonts", lambda: apply_fonts(doc, config)),
-            ("footnotes", lambda: apply_footnotes(doc, config)),
-            ("title_page", lambda: apply_title_page(doc, config)),
-            ("abstract", lambda: apply_abstract(doc, config)),
-            ("keywords", lambda: apply_keywords(doc, config)),
-            ("sections", lambda: apply_section_order(doc, config)),
-            ("citations", lambda: apply_citations(doc, config)),
-            ("references", lambda: apply_references(doc, config)),
-            ("headings", lambda: apply_headings(doc, config)),
-            ("appendix", lambda: apply_appendix(doc, config)),
-            ("tables", lambda: apply_tables(doc, config)),
-            ("figures", lambda: apply_figures(doc, config)),
-            ("equations", lambda: apply_equations(doc, config)),
-        ]
-
-        for step_name, step_fn in steps:
+        # Run each formatter step in dependency order, catching per-step errors.
+        for step_name, step_fn in _STEP_ORDER:
             try:
-                result = step_fn()
+                result = step_fn(doc, config, ctx)
                 if result:  # formatters return dict with warnings/stats
                     warnings.extend(result.get("warnings", []))
-                    # Merge stats
-                    for key in stats.model_fields:
-                        if key in result.get("stats", {}):
-                            setattr(stats, key, getattr(stats, key) + result["stats"][key])
+                    # Merge stats (formatters may report extra, non-schema keys)
+                    for key, value in result.get("stats", {}).items():
+                        if key in stats:
+                            stats[key] += value
             except Exception as e:
                 logger.warning(f"Step '{step_name}' failed: {e}")
                 warnings.append(f"Step '{step_name}' partially failed: {str(e)}")
 
-        # Save output
-        doc.save(output_path)
+        # Save output (media parts are stored, not re-deflated)
+        save_document(doc, output_path)
 
         return FormattingResult(
             success=True, warnings=warnings, errors=errors,
-            stats=stats, output_path=output_path
+            stats=FormattingStats(**stats), output_path=output_path
         )
     except Exception as e:
         logger.error(f"Pipeline failed: {e}")
         return FormattingResult(
             success=False, warnings=warnings,
-            errors=[str(e)], stats=stats, output_path=None
+            errors=[str(e)], stats=FormattingStats(**stats), output_path=None
         )
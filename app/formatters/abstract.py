@@ -7,6 +7,19 @@ import re
 from docx.shared import Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 
+from app.core.document_parser import FormatterContext, replace_paragraph_text
+
+
+# Leading "Abstract", "ABSTRACT:", "Abstract." heading label.
+_ABSTRACT_PREFIX_RE = re.compile(r"^abstract\s*[:.]?\s*", re.IGNORECASE)
+
+# Single-level heading number prefix such as "1. " or "1) ".
+_NUM_PREFIX_RE = re.compile(r"^\d+[\.\)]\s*")
+
+# First characters that can lower-case to the start of "keyword" (U+212A
+# KELVIN SIGN lower-cases to "k").
+_KEYWORD_LEADS = frozenset("kK\u212a")
+
 
 ALIGNMENT_MAP = {
     "left": WD_ALIGN_PARAGRAPH.LEFT,
@@ -17,100 +30,98 @@ ALIGNMENT_MAP = {
 
 def _apply_alignment(paragraph, alignment_name: str) -> None:
     """Set *paragraph* alignment from a string like ``"center"`` or ``"left"``."""
-    alignment = ALIGNMENT_MAP.get(alignment_name.lower())
+    # Configs spell these in lower case; only lower-case on a miss.
+    alignment = ALIGNMENT_MAP.get(alignment_name)
+    if alignment is None:
+        alignment = ALIGNMENT_MAP.get(alignment_name.lower())
     if alignment is not None:
         paragraph.paragraph_format.alignment = alignment
 
 
-def _find_abstract_paragraph(doc):
-    """Return the paragraph that contains the abstract heading.
+def _lead_char(text: str) -> str:
+    """Return the first non-whitespace character of *text*, or ``""``."""
+    for ch in text:
+        if not ch.isspace():
+            return ch
+    return ""
 
-    Looks for a paragraph whose text starts with "abstract" (case-insensitive),
-    whose style name contains "abstract", or that is a heading paragraph whose
-    stripped text equals "abstract".
-    """
-    for paragraph in doc.paragraphs:
-        style_name = (paragraph.style.name or "").lower()
-        text = paragraph.text.strip().lower()
-        # Strip potential heading number prefix (e.g. "1. Abstract")
-        stripped = re.sub(r"^\d+[\.\)]\s*", "", text)
-        if stripped.startswith("abstract") or "abstract" in style_name:
-            return paragraph
-    return None
 
+def _find_abstract(paragraphs: list, style_names: list[str]):
+    """Locate the abstract heading paragraph and the body that follows it.
 
-def _count_abstract_body_words(doc, abstract_para) -> int:
-    """Count the words in the abstract body.
+    The heading is the first paragraph whose style name contains
+    "abstract" or whose text starts with "abstract" (case-insensitive,
+    after any heading number such as "1. ").  The body is the run of
+    paragraphs after it up to the next headed paragraph or keywords line.
 
-    The abstract body is assumed to be the paragraphs between the abstract
-    heading and the next headed paragraph (or keywords paragraph).  If the
-    abstract heading and body are in the same paragraph (after a colon or
-    similar), the body portion of that paragraph is counted instead.
-    """
-    # Check if abstract text contains body after heading on the same line.
-    text = abstract_para.text.strip()
-    # Strip the heading portion (e.g. "Abstract" or "ABSTRACT:")
-    heading_match = re.match(r"^abstract\s*[:.]?\s*", text, re.IGNORECASE)
-    if heading_match:
-        remainder = text[heading_match.end():]
-        if remainder.strip():
-            return len(remainder.split())
-
-    # Otherwise count words in subsequent paragraphs until a heading or
-    # keyword line is reached.
-    paragraphs = doc.paragraphs
-    start_counting = False
-    word_count = 0
+    Both are found in one pass that reads each paragraph's text once;
+    the heading text is returned and the body's word count is taken from
+    the text read for the keywords check.
 
-    # Use text matching to identify the abstract paragraph since object identity doesn't work
-    abstract_text = abstract_para.text.strip()
+    Returns:
+        ``(abstract_para, abstract_text, body_paras, body_words)``, or
+        ``(None, "", [], 0)`` if there is no abstract.
+    """
+    rows = zip(paragraphs, style_names)
 
-    for para in paragraphs:
-        if para.text.strip() == abstract_text and para.style.name == abstract_para.style.name:
-            start_counting = True
-            continue
-        if not start_counting:
+    for paragraph, style_name in rows:
+        text = paragraph.text
+        if "abstract" in style_name.lower():
+            break
+        # Only text led by "a"/"A" or a heading number can qualify; check
+        # that before lower-casing the whole paragraph.
+        lead = _lead_char(text)
+        if lead not in ("a", "A") and not lead.isdecimal():
             continue
+        # Strip potential heading number prefix (e.g. "1. Abstract")
+        stripped = _NUM_PREFIX_RE.sub("", text.strip().lower())
+        if stripped.startswith("abstract"):
+            break
+    else:
+        return None, "", [], 0
+    abstract_para = paragraph
+    abstract_text = text
 
+    # Continue from the paragraph after the heading.
+    body_paras = []
+    body_words = 0
+    for paragraph, style_name in rows:
         # Stop at next heading or keywords.
-        if para.style.name.startswith("Heading"):
+        if style_name.startswith("Heading"):
             break
-        if para.text.strip().lower().startswith("keyword"):
+        text = paragraph.text
+        if (
+            _lead_char(text) in _KEYWORD_LEADS
+            and text.strip().lower().startswith("keyword")
+        ):
             break
+        body_paras.append(paragraph)
+        body_words += len(text.split())
 
-        word_count += len(para.text.split())
-
-    return word_count
-
-
-def _get_abstract_body_paragraphs(doc, abstract_para) -> list:
-    """Return list of paragraphs in the abstract body (excluding heading)."""
-    paragraphs = doc.paragraphs
-    start_collecting = False
-    body_paras = []
+    return abstract_para, abstract_text, body_paras, body_words
 
-    # Use text matching to identify the abstract paragraph since object identity doesn't work
-    abstract_text = abstract_para.text.strip()
 
-    for para in paragraphs:
-        if para.text.strip() == abstract_text and para.style.name == abstract_para.style.name:
-            start_collecting = True
-            continue
-        if not start_collecting:
-            continue
-
-        # Stop at next heading or keywords.
-        if para.style.name.startswith("Heading"):
-            break
-        if para.text.strip().lower().startswith("keyword"):
-            break
+def _count_abstract_body_words(abstract_para, body_words: int) -> int:
+    """Count the words in the abstract body.
 
-        body_paras.append(para)
+    If the abstract heading and body are in the same paragraph (after a
+    colon or similar), the body portion of that paragraph is counted.
+    Otherwise *body_words*, the count over the separate body paragraphs
+    from :func:`_find_abstract`, is returned.
+    """
+    # Check if abstract text contains body after heading on the same line.
+    text = abstract_para.text.strip()
+    # Strip the heading portion (e.g. "Abstract" or "ABSTRACT:")
+    heading_match = _ABSTRACT_PREFIX_RE.match(text)
+    if heading_match:
+        remainder = text[heading_match.end():]
+        if remainder.strip():
+            return len(remainder.split())
 
-    return body_paras
+    return body_words
 
 
-def apply_abstract(doc, config) -> dict:
+def apply_abstract(doc, config, ctx: FormatterContext | None = None) -> dict:
     """Enhanced abstract formatting.
 
     Reads ``config["abstract"]`` with keys:
@@ -125,14 +136,19 @@ def apply_abstract(doc, config) -> dict:
     Args:
         doc: A python-docx ``Document`` object.
         config: Journal configuration dict.
+        ctx: Shared ``FormatterContext``; built from *doc* when omitted.
 
     Returns:
         dict with ``"warnings"`` (list[str]) and ``"stats"`` (dict).
     """
+    if ctx is None:
+        ctx = FormatterContext.from_document(doc)
     warnings: list[str] = []
 
     abstract_config = config.get("abstract", {})
-    abstract_para = _find_abstract_paragraph(doc)
+    abstract_para, current_text, body_paras, body_words = _find_abstract(
+        ctx.paragraphs, ctx.style_names
+    )
 
     if abstract_para is None:
         warnings.append("Could not identify an abstract section in the document.")
@@ -148,13 +164,8 @@ def apply_abstract(doc, config) -> dict:
     spacing_after_heading = abstract_config.get("spacing_after_heading", 6)
 
     # Reformat abstract heading text
-    current_text = abstract_para.text
-    new_text = re.sub(
-        r"^abstract\s*[:.]?\s*",
-        heading_text + " ",
-        current_text,
-        count=1,
-        flags=re.IGNORECASE,
+    new_text = _ABSTRACT_PREFIX_RE.sub(
+        heading_text + " ", current_text, count=1
     ).rstrip()
 
     # If the replacement ended up only being the heading with trailing
@@ -162,12 +173,7 @@ def apply_abstract(doc, config) -> dict:
     if new_text.strip() == heading_text:
         new_text = heading_text
 
-    if abstract_para.runs:
-        abstract_para.runs[0].text = new_text
-        for run in abstract_para.runs[1:]:
-            run.text = ""
-    else:
-        abstract_para.text = new_text
+    replace_paragraph_text(abstract_para, new_text)
 
     # Apply font size and bold to the abstract heading paragraph
     for run in abstract_para.runs:
@@ -181,7 +187,6 @@ def apply_abstract(doc, config) -> dict:
     abstract_para.paragraph_format.space_after = Pt(spacing_after_heading)
 
     # Format body paragraphs (if separate from heading)
-    body_paras = _get_abstract_body_paragraphs(doc, abstract_para)
     for body_para in body_paras:
         # Apply font size
         for run in body_para.runs:
@@ -193,7 +198,7 @@ def apply_abstract(doc, config) -> dict:
             body_para.paragraph_format.left_indent = Inches(indent_body)
 
     # Word count check
-    word_count = _count_abstract_body_words(doc, abstract_para)
+    word_count = _count_abstract_body_words(abstract_para, body_words)
     if max_words is not None and word_count > max_words:
         warnings.append(
             f"Abstract contains approximately {word_count} words, "
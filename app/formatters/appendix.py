@@ -3,14 +3,27 @@
 from __future__ import annotations
 
 import re
+from string import ascii_uppercase
 
 from docx.shared import Pt
 
 from app.core.document_parser import (
-    get_all_sections,
-    get_heading_level,
+    FormatterContext,
     strip_heading_number,
     is_reference_heading,
+    replace_paragraph_text,
+)
+
+
+# Title after the "Appendix [label]" lead-in, e.g. "Appendix A: Title".
+_APPENDIX_TITLE_RE = re.compile(
+    r"appendix\s*[A-Z0-9]*\s*[:.]?\s*(.*)", re.IGNORECASE
+)
+
+_ROMAN_NUMERALS = (
+    (1000, "M"), (900, "CM"), (500, "D"), (400, "CD"),
+    (100, "C"), (90, "XC"), (50, "L"), (40, "XL"),
+    (10, "X"), (9, "IX"), (5, "V"), (4, "IV"), (1, "I"),
 )
 
 
@@ -18,86 +31,92 @@ def _int_to_letter(num: int) -> str:
     """Convert an integer (1, 2, 3...) to uppercase letter (A, B, C...)."""
     if num < 1 or num > 26:
         return str(num)  # Fallback for out of range
-    return chr(64 + num)  # 65 is 'A'
+    return ascii_uppercase[num - 1]
 
 
-def _int_to_roman(num: int) -> str:
+def _compute_roman(num: int) -> str:
     """Convert an integer to an uppercase Roman numeral string."""
     result = []
-    for value, numeral in (
-        (1000, "M"), (900, "CM"), (500, "D"), (400, "CD"),
-        (100, "C"), (90, "XC"), (50, "L"), (40, "XL"),
-        (10, "X"), (9, "IX"), (5, "V"), (4, "IV"), (1, "I"),
-    ):
+    for value, numeral in _ROMAN_NUMERALS:
         while num >= value:
             result.append(numeral)
             num -= value
     return "".join(result)
 
 
+# Appendix counts are small; labels up to 50 are a plain list index.
+_ROMAN_TABLE = tuple(_compute_roman(i) for i in range(51))
+
+
+def _int_to_roman(num: int) -> str:
+    """Convert an integer to an uppercase Roman numeral string."""
+    if 0 <= num < len(_ROMAN_TABLE):
+        return _ROMAN_TABLE[num]
+    return _compute_roman(num)
+
+
+_LABEL_FORMATTERS = {
+    "letter": _int_to_letter,
+    "roman": _int_to_roman,
+    "arabic": str,
+}
+
+
 def _format_appendix_label(num: int, format_type: str) -> str:
     """Return appendix label formatted as letter, roman, or arabic."""
-    if format_type == "letter":
-        return _int_to_letter(num)
-    elif format_type == "roman":
-        return _int_to_roman(num)
-    else:  # arabic
-        return str(num)
+    # Unknown formats fall back to arabic numbering.
+    return _LABEL_FORMATTERS.get(format_type, str)(num)
 
 
-def _detect_appendix_sections(doc) -> list[dict]:
+def _detect_appendix_sections(
+    paragraphs: list, heading_levels: list[int | None]
+) -> list[dict]:
     """Detect appendix heading paragraphs.
 
     Looks for:
     - Paragraphs with heading styles
     - Text starting with "appendix" (case-insensitive)
-    - After references section (uses get_all_sections())
+    - After the References heading, if there is one (found in the same pass)
 
     Returns list of appendix metadata with:
         - para_idx: paragraph index
         - level: heading level
         - text: current heading text
+        - stripped: heading text without its number prefix
     """
-    sections = get_all_sections(doc)
-
-    # Find the References section
-    references_idx = None
-    for section in sections:
-        heading_text = strip_heading_number(section["heading"])
-        if is_reference_heading(heading_text):
-            references_idx = section["start"]
-            break
-
-    # Detect appendix sections
     appendices = []
-    paragraphs = doc.paragraphs
-
-    for idx, para in enumerate(paragraphs):
-        # Skip paragraphs before References (if found)
-        if references_idx is not None and idx <= references_idx:
-            continue
+    seen_references = False
 
-        # Check if this is a heading paragraph
-        level = get_heading_level(para)
+    for idx, level in enumerate(heading_levels):
+        # Only heading paragraphs can start an appendix
         if level is None:
             continue
 
-        # Check if text starts with "appendix"
+        para = paragraphs[idx]
         text = para.text.strip()
         stripped = strip_heading_number(text)
 
+        # Appendices follow References when the document has one, so
+        # anything collected before the first References heading is dropped.
+        if not seen_references and is_reference_heading(stripped):
+            seen_references = True
+            appendices.clear()
+            continue
+
+        # Check if text starts with "appendix"
         if stripped.lower().startswith("appendix"):
             appendices.append({
                 "para_idx": idx,
                 "level": level,
                 "text": text,
+                "stripped": stripped,
                 "paragraph": para,
             })
 
     return appendices
 
 
-def apply_appendix(doc, config) -> dict:
+def apply_appendix(doc, config, ctx: FormatterContext | None = None) -> dict:
     """Format appendix sections with proper labeling.
 
     Reads ``config["appendix"]`` with keys:
@@ -111,6 +130,7 @@ def apply_appendix(doc, config) -> dict:
     Args:
         doc: A python-docx ``Document`` object.
         config: Journal configuration dict.
+        ctx: Shared ``FormatterContext``; built from *doc* when omitted.
 
     Returns:
         dict with ``"warnings"`` (list[str]) and ``"stats"`` (dict).
@@ -127,7 +147,9 @@ def apply_appendix(doc, config) -> dict:
     numbering_format = appendix_config.get("numbering_format", "{prefix} {label}")
 
     # Detect appendix sections
-    appendices = _detect_appendix_sections(doc)
+    if ctx is None:
+        ctx = FormatterContext.from_document(doc)
+    appendices = _detect_appendix_sections(ctx.paragraphs, ctx.heading_levels)
 
     if not appendices:
         # Appendices are optional, so don't warn
@@ -136,18 +158,13 @@ def apply_appendix(doc, config) -> dict:
     # Format each appendix
     for idx, appendix_info in enumerate(appendices, start=1):
         para = appendix_info["paragraph"]
-        current_text = appendix_info["text"]
 
         # Generate label (A, B, C or I, II, III, etc.)
         label = _format_appendix_label(idx, format_type)
 
         # Extract title if present (text after "Appendix")
         # Match patterns like "Appendix A: Title" or "Appendix: Title" or just "Appendix"
-        title_match = re.search(
-            r"appendix\s*[A-Z0-9]*\s*[:.]?\s*(.*)",
-            current_text,
-            re.IGNORECASE
-        )
+        title_match = _APPENDIX_TITLE_RE.match(appendix_info["stripped"])
         title = ""
         if title_match:
             title = title_match.group(1).strip()
@@ -171,12 +188,7 @@ def apply_appendix(doc, config) -> dict:
                 new_text = f"{new_text}: {title}"
 
         # Update paragraph text
-        if para.runs:
-            para.runs[0].text = new_text
-            for run in para.runs[1:]:
-                run.text = ""
-        else:
-            para.text = new_text
+        replace_paragraph_text(para, new_text)
 
     return {
         "warnings": warnings,
@@ -0,0 +1,77 @@
+"""Combined layout and body-font formatter: one pass over the paragraphs.
+
+Line spacing (from layout) and the body font (from fonts) both touch every
+paragraph and neither depends on the other, so the pipeline applies them
+together instead of walking the document twice.
+"""
+
+from docx.shared import Pt
+
+from app.core.document_parser import FormatterContext
+from app.formatters.fonts import _format_body_runs, _half_points, apply_fonts
+from app.formatters.layout import (
+    _apply_line_spacing,
+    _apply_page_setup,
+    _line_spacing_twips,
+    apply_layout,
+)
+
+
+def apply_layout_and_fonts(doc, config, ctx=None):
+    """Apply page layout and body font settings in a single paragraph pass.
+
+    Equivalent to running ``apply_layout`` followed by ``apply_fonts``;
+    reads the same ``config["page_layout"]`` and ``config["fonts"]["body"]``
+    keys and returns the union of their stats.  When one of the two is
+    ``null`` the other formatter runs on its own.
+
+    Args:
+        doc: A python-docx Document object.
+        config: Journal configuration dict.
+        ctx: Shared FormatterContext; built from doc when omitted.
+
+    Returns:
+        dict with "warnings" (list[str]) and "stats" (dict).
+    """
+    layout = config.get("page_layout", {})
+    body_config = config.get("fonts", {}).get("body", {})
+    if layout is None:
+        return apply_fonts(doc, config, ctx)
+    if body_config is None:
+        return apply_layout(doc, config, ctx)
+
+    if ctx is None:
+        ctx = FormatterContext.from_document(doc)
+    warnings = []
+    stats = {}
+
+    _apply_page_setup(ctx.sections, layout, warnings, stats)
+    line_spacing_value = layout.get("line_spacing", 1.0)
+    line_twips = _line_spacing_twips(line_spacing_value)
+
+    family = body_config.get("family", "Times New Roman")
+    size = body_config.get("size", 12.0)
+    size_half_points = _half_points(Pt(size))
+
+    paragraphs_modified = 0
+    runs_modified = 0
+
+    for paragraph, style_name in zip(ctx.paragraphs, ctx.style_names):
+        _apply_line_spacing(paragraph._p, line_twips)
+
+        # Skip headings — their formatting is handled by apply_headings
+        if style_name.startswith("Heading"):
+            continue
+
+        modified = _format_body_runs(paragraph, family, size_half_points)
+        if modified:
+            paragraphs_modified += 1
+            runs_modified += modified
+
+    stats["line_spacing"] = line_spacing_value
+    stats["font_family"] = family
+    stats["font_size_pt"] = size
+    stats["paragraphs_modified"] = paragraphs_modified
+    stats["runs_modified"] = runs_modified
+
+    return {"warnings": warnings, "stats": stats}
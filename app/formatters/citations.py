@@ -5,87 +5,167 @@ from __future__ import annotations
 import re
 from copy import deepcopy
 
+from docx.oxml import OxmlElement
+from docx.oxml.ns import nsmap, qn
+from docx.oxml.text.run import CT_R
 from docx.text.paragraph import Paragraph
+from docx.text.run import Run
+from lxml import etree
 
-from app.core.document_parser import get_heading_level, merge_paragraph_runs
+from app.core.document_parser import (
+    FormatterContext,
+    merge_paragraph_runs,
+    paragraph_heading_levels,
+)
 
 
 # ---------------------------------------------------------------------------
 # Regex patterns for citation detection
 # ---------------------------------------------------------------------------
 
-# APA / author-year: (Smith, 2024), (Smith & Jones, 2024), (Smith et al., 2024b)
-# Also matches single entries within multi-citations like (Smith, 2020; Jones, 2019)
-AUTHOR_YEAR_RE = re.compile(
-    r'\(([A-Z][a-z]+(?:\s(?:&|and)\s[A-Z][a-z]+)*(?:\set\sal\.)?),?\s*(\d{4}[a-z]?)\)'
-)
-
-# Multi-citation in one parenthesized group: (Smith, 2020; Jones & Brown, 2019)
-MULTI_AUTHOR_YEAR_RE = re.compile(
-    r'\(([A-Z][a-z]+(?:\s(?:&|and)\s[A-Z][a-z]+)*(?:\set\sal\.)?),?\s*\d{4}[a-z]?'
-    r'(?:\s*;\s*[A-Z][a-z]+(?:\s(?:&|and)\s[A-Z][a-z]+)*(?:\set\sal\.?)?,?\s*\d{4}[a-z]?)+\)'
+# Shared fragments: an author group ("Smith", "Smith & Jones", "Smith et al.")
+# and a year with optional disambiguation letter ("2024", "2024b").
+_AUTHOR = r'[A-Z][a-z]+(?:\s(?:&|and)\s[A-Z][a-z]+)*(?:\set\sal\.)?'
+_AUTHOR_TAIL = r'[A-Z][a-z]+(?:\s(?:&|and)\s[A-Z][a-z]+)*(?:\set\sal\.?)?'
+_YEAR = r'\d{4}[a-z]?'
+_MULTI_BODY = (
+    rf'{_AUTHOR},?\s*{_YEAR}(?:\s*;\s*{_AUTHOR_TAIL},?\s*{_YEAR})+'
 )
+_NUMERIC_BODY = r'\d+(?:\s*[,;\-]\s*\d+)*'
 
 # Individual citation within a multi-citation group
-INDIVIDUAL_AUTHOR_YEAR_RE = re.compile(
-    r'([A-Z][a-z]+(?:\s(?:&|and)\s[A-Z][a-z]+)*(?:\set\sal\.)?),?\s*(\d{4}[a-z]?)'
-)
-
-# Numeric bracket: [1], [1, 2], [1-3], [1; 2; 3]
-NUMERIC_BRACKET_RE = re.compile(
-    r'\[(\d+(?:\s*[,;\-]\s*\d+)*)\]'
+INDIVIDUAL_AUTHOR_YEAR_RE = re.compile(rf'({_AUTHOR}),?\s*({_YEAR})')
+
+# All three bracketed forms fused into one alternation so each paragraph is
+# scanned once; dispatch on ``match.lastgroup``.  Multi-citations are tried
+# before single ones at the same position, so a single match never falls
+# inside a multi span.
+CITATION_RE = re.compile(
+    rf'(?P<multi>\({_MULTI_BODY}\))'
+    rf'|(?P<single>\((?P<author>{_AUTHOR}),?\s*(?P<year>{_YEAR})\))'
+    rf'|(?P<numeric>\[(?P<nums>{_NUMERIC_BODY})\])'
 )
 
 # Superscript numbers are detected at the run level (font.superscript),
 # so we just need a pattern to recognise bare digit sequences.
 SUPERSCRIPT_NUM_RE = re.compile(r'^(\d+(?:\s*[,;\-]\s*\d+)*)$')
 
+# One number or range per match in a numeric list; any further "-N" links
+# in a chained range like "1-3-5" are consumed and ignored.
+_RANGE_RE = re.compile(r'(\d+)(?:\s*-\s*(\d+))?(?:\s*-\s*\d+)*')
+
 STYLE_NAMES = ("author_year", "numeric_bracket", "superscript")
 
+_W_R = qn("w:r")
+_W_RPR = qn("w:rPr")
+_W_VERT_ALIGN = qn("w:vertAlign")
+_W_VAL = qn("w:val")
+
+# Direct <w:r> children of a paragraph whose formatting is superscript.
+_SUPERSCRIPT_RUNS = etree.XPath(
+    './w:r[w:rPr/w:vertAlign/@w:val="superscript"]',
+    namespaces={"w": nsmap["w"]},
+)
+_XML_SPACE = qn("xml:space")
+
 
 # ---------------------------------------------------------------------------
 # Detection helpers
 # ---------------------------------------------------------------------------
 
-def _count_superscript_citations(doc, limit: int = 20) -> int:
-    """Count paragraphs containing superscript digit runs (up to *limit* body paragraphs)."""
-    count = 0
-    body_seen = 0
-    for para in doc.paragraphs:
-        if get_heading_level(para) is not None:
-            continue
-        body_seen += 1
-        if body_seen > limit:
-            break
-        for run in para.runs:
-            if run.font.superscript and SUPERSCRIPT_NUM_RE.search(run.text.strip()):
-                count += 1
-                break  # one match per paragraph is enough
-    return count
+def _paragraph_text(texts: list[str | None], idx: int, para: Paragraph) -> str:
+    """Return the merged run text of *para*, memoised in *texts* by index."""
+    text = texts[idx]
+    if text is None:
+        text = texts[idx] = merge_paragraph_runs(para)
+    return text
+
+
+def _is_superscript_run(r: CT_R) -> bool:
+    """Return ``True`` if the ``<w:r>`` element *r* is set to superscript.
+
+    Reads ``w:rPr/w:vertAlign/@w:val`` directly, equivalent to
+    ``run.font.superscript`` being ``True``.
+    """
+    rPr = r.find(_W_RPR)
+    if rPr is None:
+        return False
+    vert_align = rPr.find(_W_VERT_ALIGN)
+    return vert_align is not None and vert_align.get(_W_VAL) == "superscript"
+
 
+def _has_superscript_citation(para: Paragraph) -> bool:
+    """Return ``True`` if *para* contains a superscript run of citation digits."""
+    for r in _SUPERSCRIPT_RUNS(para._p):
+        if SUPERSCRIPT_NUM_RE.search(r.text.strip()):
+            return True
+    return False
 
-def detect_input_style(doc) -> str:
+
+def detect_input_style(
+    doc,
+    paragraphs: list | None = None,
+    heading_levels: list[int | None] | None = None,
+    texts: list[str | None] | None = None,
+) -> str:
     """Scan the first 20 non-heading paragraphs and return the dominant citation style.
 
     Returns one of ``"author_year"``, ``"numeric_bracket"``, or ``"superscript"``.
     Falls back to ``"author_year"`` when no citations are detected.
+
+    Scanning stops early once the remaining paragraphs can no longer
+    change the outcome.
+
+    *paragraphs*, *heading_levels* and *texts* are optional per-paragraph
+    caches shared with :func:`extract_citations` (see :func:`apply_citations`).
     """
+    if paragraphs is None:
+        paragraphs = doc.paragraphs
+    if heading_levels is None:
+        heading_levels = paragraph_heading_levels(doc)
+    if texts is None:
+        texts = [None] * len(heading_levels)
     counts = {"author_year": 0, "numeric_bracket": 0, "superscript": 0}
 
+    limit = 20
     body_seen = 0
-    for para in doc.paragraphs:
-        if get_heading_level(para) is not None:
+    for idx, para in enumerate(paragraphs):
+        if heading_levels[idx] is not None:
             continue
         body_seen += 1
-        if body_seen > 20:
+        if body_seen > limit:
             break
-        text = merge_paragraph_runs(para)
-        if AUTHOR_YEAR_RE.search(text) or MULTI_AUTHOR_YEAR_RE.search(text):
+        text = _paragraph_text(texts, idx, para)
+        has_author_year = has_numeric = False
+        # Every bracketed citation needs "(" or "["; most prose has neither,
+        # and a substring test is far cheaper than starting the regex.
+        if "(" in text or "[" in text:
+            for m in CITATION_RE.finditer(text):
+                if m.lastgroup == "numeric":
+                    has_numeric = True
+                else:
+                    has_author_year = True
+                if has_author_year and has_numeric:
+                    break
+        if has_author_year:
             counts["author_year"] += 1
-        if NUMERIC_BRACKET_RE.search(text):
+        if has_numeric:
             counts["numeric_bracket"] += 1
 
-    counts["superscript"] = _count_superscript_citations(doc, limit=20)
+        remaining = limit - body_seen
+        # Superscript is last in priority, so it only wins with a strictly
+        # higher count; skip the run-level check once that is out of reach.
+        others_best = max(counts["author_year"], counts["numeric_bracket"])
+        if counts["superscript"] + remaining + 1 > others_best and _has_superscript_citation(para):
+            counts["superscript"] += 1
+
+        leader = max(STYLE_NAMES, key=lambda s: counts[s])
+        if all(
+            counts[leader] - counts[s] > remaining
+            for s in STYLE_NAMES
+            if s != leader
+        ):
+            break
 
     # Return style with the most matches; break ties by priority order.
     best = max(STYLE_NAMES, key=lambda s: counts[s])
@@ -96,90 +176,115 @@ def detect_input_style(doc) -> str:
 # Extraction
 # ---------------------------------------------------------------------------
 
-def extract_citations(doc, style: str) -> list[dict]:
+def extract_citations(
+    doc,
+    style: str,
+    paragraphs: list | None = None,
+    heading_levels: list[int | None] | None = None,
+    texts: list[str | None] | None = None,
+) -> list[dict]:
     """Return every citation occurrence found in body paragraphs.
 
     Each dict has:
         - ``para_idx`` (int): paragraph index
         - ``match_text`` (str): the literal text that was matched
+        - ``start`` / ``end`` (int): character span of ``match_text`` in the
+          paragraph's merged run text (the whole group for multi-citations)
         - ``author`` (str | None): author string if available
         - ``year`` (str | None): year string if available
         - ``numbers`` (list[int] | None): numeric ids if available
     """
+    if paragraphs is None:
+        paragraphs = doc.paragraphs
+    if heading_levels is None:
+        heading_levels = paragraph_heading_levels(doc)
+    if texts is None:
+        texts = [None] * len(heading_levels)
     citations: list[dict] = []
-    for idx, para in enumerate(doc.paragraphs):
-        if get_heading_level(para) is not None:
+    for idx, para in enumerate(paragraphs):
+        if heading_levels[idx] is not None:
             continue
-        text = merge_paragraph_runs(para)
-
         if style == "author_year":
-            # First handle multi-citations like (Smith, 2020; Jones, 2019)
-            multi_matches = set()
-            for m in MULTI_AUTHOR_YEAR_RE.finditer(text):
-                full_match = m.group(0)
-                multi_matches.add((m.start(), m.end()))
-                # Extract individual citations from within
-                inner = full_match[1:-1]  # strip parens
-                for im in INDIVIDUAL_AUTHOR_YEAR_RE.finditer(inner):
-                    citations.append({
+            text = _paragraph_text(texts, idx, para)
+            if "(" not in text:
+                continue
+            # Multi-citations like (Smith, 2020; Jones, 2019) are listed
+            # before single ones so numbering follows the same order.
+            multi_cits: list[dict] = []
+            single_cits: list[dict] = []
+            for m in CITATION_RE.finditer(text):
+                kind = m.lastgroup
+                if kind == "multi":
+                    full_match = m.group(0)
+                    start, end = m.span()
+                    inner = full_match[1:-1]  # strip parens
+                    for im in INDIVIDUAL_AUTHOR_YEAR_RE.finditer(inner):
+                        multi_cits.append({
+                            "para_idx": idx,
+                            "match_text": full_match,
+                            "start": start,
+                            "end": end,
+                            "author": im.group(1),
+                            "year": im.group(2),
+                            "numbers": None,
+                            "_is_multi": True,
+                        })
+                elif kind == "single":
+                    single_cits.append({
                         "para_idx": idx,
-                        "match_text": full_match,
-                        "author": im.group(1),
-                        "year": im.group(2),
+                        "match_text": m.group(0),
+                        "start": m.start(),
+                        "end": m.end(),
+                        "author": m.group("author"),
+                        "year": m.group("year"),
                         "numbers": None,
-                        "_is_multi": True,
                     })
-            # Then handle single citations, skipping spans already covered
-            for m in AUTHOR_YEAR_RE.finditer(text):
-                # Skip if this match falls within a multi-citation
-                overlaps = any(
-                    ms <= m.start() and m.end() <= me
-                    for ms, me in multi_matches
-                )
-                if overlaps:
-                    continue
-                citations.append({
-                    "para_idx": idx,
-                    "match_text": m.group(0),
-                    "author": m.group(1),
-                    "year": m.group(2),
-                    "numbers": None,
-                })
+            citations.extend(multi_cits)
+            citations.extend(single_cits)
         elif style == "numeric_bracket":
-            for m in NUMERIC_BRACKET_RE.finditer(text):
-                nums = _parse_numeric_list(m.group(1))
+            text = _paragraph_text(texts, idx, para)
+            if "[" not in text:
+                continue
+            for m in CITATION_RE.finditer(text):
+                if m.lastgroup != "numeric":
+                    continue
+                nums = _parse_numeric_list(m.group("nums"))
                 citations.append({
                     "para_idx": idx,
                     "match_text": m.group(0),
+                    "start": m.start(),
+                    "end": m.end(),
                     "author": None,
                     "year": None,
                     "numbers": nums,
                 })
         elif style == "superscript":
-            for run in para.runs:
-                if run.font.superscript and SUPERSCRIPT_NUM_RE.search(run.text.strip()):
-                    nums = _parse_numeric_list(run.text.strip())
+            offset = 0
+            for r in para._p.iterchildren(_W_R):
+                run_text = r.text
+                run_end = offset + len(run_text)
+                if _is_superscript_run(r) and SUPERSCRIPT_NUM_RE.search(run_text.strip()):
+                    nums = _parse_numeric_list(run_text.strip())
                     citations.append({
                         "para_idx": idx,
-                        "match_text": run.text,
+                        "match_text": run_text,
+                        "start": offset,
+                        "end": run_end,
                         "author": None,
                         "year": None,
                         "numbers": nums,
                     })
+                offset = run_end
     return citations
 
 
 def _parse_numeric_list(text: str) -> list[int]:
     """Parse a string like ``'1, 3-5, 7'`` into ``[1, 3, 4, 5, 7]``."""
     nums: list[int] = []
-    for part in re.split(r'[,;]\s*', text):
-        part = part.strip()
-        range_match = re.match(r'(\d+)\s*-\s*(\d+)', part)
-        if range_match:
-            start, end = int(range_match.group(1)), int(range_match.group(2))
-            nums.extend(range(start, end + 1))
-        elif part.isdigit():
-            nums.append(int(part))
+    for m in _RANGE_RE.finditer(text):
+        start = int(m.group(1))
+        end = int(m.group(2)) if m.group(2) else start
+        nums.extend(range(start, end + 1))
     return nums
 
 
@@ -189,7 +294,7 @@ def _parse_numeric_list(text: str) -> list[int]:
 
 def build_citation_map(
     citations: list[dict], target_style: str
-) -> dict[str, str | int]:
+) -> tuple[dict[str, str | int], dict[tuple[str, str], int]]:
     """Build a mapping from original citation text to a replacement value.
 
     For *author_year -> numeric* conversions the map assigns sequential
@@ -197,28 +302,30 @@ def build_citation_map(
     reliably mappable and will return an empty dict.
 
     Returns:
-        A dict keyed by ``match_text`` whose values are either an ``int``
-        (the assigned number) or a ``str`` (replacement text).
+        A ``(cmap, ay_to_num)`` pair.  ``cmap`` is keyed by ``match_text``
+        and its values are either an ``int`` (the assigned number) or a
+        ``str`` (replacement text).  ``ay_to_num`` maps every
+        ``(author, year)`` pair, including each entry of a multi-citation,
+        to its assigned number.
     """
     cmap: dict[str, str | int] = {}
+    author_year_counter: dict[tuple[str, str], int] = {}
 
     if target_style in ("numeric_bracket", "superscript"):
         # Assign numbers in order of appearance; same author-year pair
         # always gets the same number.
-        author_year_counter: dict[str, int] = {}
         current_num = 1
         for cit in citations:
             key = cit["match_text"]
-            if key in cmap:
-                continue
             # For author-year citations, deduplicate by (author, year).
             ay_key = (cit.get("author"), cit.get("year"))
             if ay_key != (None, None):
-                if ay_key not in author_year_counter:
-                    author_year_counter[ay_key] = current_num
+                num = author_year_counter.get(ay_key)
+                if num is None:
+                    num = author_year_counter[ay_key] = current_num
                     current_num += 1
-                cmap[key] = author_year_counter[ay_key]
-            else:
+                cmap.setdefault(key, num)
+            elif key not in cmap:
                 # Numeric sources: keep their existing number(s)
                 if cit.get("numbers"):
                     cmap[key] = cit["numbers"][0]
@@ -226,145 +333,94 @@ def build_citation_map(
                     cmap[key] = current_num
                     current_num += 1
     # numeric -> author_year cannot be done without reference metadata.
-    return cmap
+    return cmap, author_year_counter
 
 
 # ---------------------------------------------------------------------------
 # Run-level replacement
 # ---------------------------------------------------------------------------
 
-def replace_in_runs(
+def _rewrite_paragraph_runs(
     paragraph: Paragraph,
-    old_text: str,
-    new_text: str,
-    superscript: bool = False,
-) -> bool:
-    """Replace *old_text* inside the paragraph's runs with *new_text*.
-
-    The function joins all run texts to locate the character offset of
-    *old_text*, then splits or adjusts runs so that the replacement
-    occupies its own run (allowing independent formatting).
-
-    If *superscript* is ``True`` the replacement run's
-    ``font.superscript`` is set to ``True``.
-
-    Returns ``True`` if a replacement was made, ``False`` otherwise.
+    replacements: list[tuple[int, int, str, bool]],
+) -> None:
+    """Apply several replacements to *paragraph* in a single pass over its runs.
+
+    Each replacement is ``(start, end, new_text, superscript)``, where
+    ``start``/``end`` are offsets into the paragraph's merged run text as
+    it was before any of the replacements.  Spans must not overlap.
+
+    Every replacement gets a run of its own, inserted after the text that
+    precedes it and carrying the formatting of the run it starts in.  Text
+    before the first replacement in a run stays in that run; text after a
+    replacement in the same run moves to a new run with the same
+    formatting; runs entirely covered by a replacement are emptied.  Runs
+    outside every span are left untouched.
     """
-    runs = paragraph.runs
-    if not runs:
-        return False
-
-    full_text = "".join(r.text for r in runs)
-    start = full_text.find(old_text)
-    if start == -1:
-        return False
-
-    end = start + len(old_text)
-
-    # Determine which runs are affected.
-    run_boundaries: list[tuple[int, int]] = []  # (start_char, end_char) per run
+    pending = sorted(replacements, key=lambda r: r[0])
+    count = len(pending)
+    i = 0
     offset = 0
-    for run in runs:
-        run_boundaries.append((offset, offset + len(run.text)))
-        offset += len(run.text)
-
-    # Find the first and last run indices that overlap with [start, end).
-    first_run_idx: int | None = None
-    last_run_idx: int | None = None
-    for i, (rs, re_) in enumerate(run_boundaries):
-        if rs < end and re_ > start:
-            if first_run_idx is None:
-                first_run_idx = i
-            last_run_idx = i
-
-    if first_run_idx is None or last_run_idx is None:
-        return False  # pragma: no cover
-
-    # Collect formatting from the first affected run to preserve styles.
-    ref_run = runs[first_run_idx]
-
-    # Build the three text segments: before, replacement, after — all
-    # relative to the span of runs we're touching.
-    span_start = run_boundaries[first_run_idx][0]
-    span_end = run_boundaries[last_run_idx][1]
-    span_text = full_text[span_start:span_end]
-
-    before_text = full_text[span_start:start]
-    after_text = full_text[end:span_end]
-
-    # Rewrite the first affected run with the before + replacement text.
-    # Clear the intermediate runs and put the after text in the last run.
-    if first_run_idx == last_run_idx:
-        # Everything in one run — split it into up to three runs.
-        run = runs[first_run_idx]
-        run.text = before_text
-
-        # Insert a new run for the replacement right after.
-        new_run = _insert_run_after(paragraph, first_run_idx, new_text, ref_run)
-        if superscript:
-            new_run.font.superscript = True
-
-        # Insert after-text run if non-empty.
-        if after_text:
-            _insert_run_after(
-                paragraph, first_run_idx + 1, after_text, ref_run
-            )
-    else:
-        # Multiple runs — put before in first, clear middle, after in last.
-        runs[first_run_idx].text = before_text
-
-        new_run = _insert_run_after(
-            paragraph, first_run_idx, new_text, ref_run
-        )
-        if superscript:
-            new_run.font.superscript = True
-
-        # Clear intermediate runs (offset by 1 because we inserted a run).
-        for i in range(first_run_idx + 2, last_run_idx + 2):
-            if i < len(paragraph.runs):
-                paragraph.runs[i].text = ""
-
-        # Put after-text in the (shifted) last run.
-        shifted_last = last_run_idx + 1  # +1 for inserted run
-        if shifted_last < len(paragraph.runs):
-            paragraph.runs[shifted_last].text = after_text
-
-    return True
-
-
-def _insert_run_after(paragraph: Paragraph, run_idx: int, text: str, ref_run):
-    """Insert a new run with *text* after the run at *run_idx*.
-
-    Copies basic character formatting (font name, size, bold, italic)
-    from *ref_run*.
+    for run in paragraph.runs:
+        if i == count:
+            break
+        text = run.text
+        run_start = offset
+        run_end = offset = run_start + len(text)
+        if pending[i][0] >= run_end:
+            continue
 
-    Returns the newly created run element.
+        # Split this run into (text, superscript) pieces; superscript is
+        # None for leftover original text.
+        pieces: list[tuple[str, bool | None]] = []
+        pos = run_start
+        while i < count and pending[i][0] < run_end:
+            start, end, new_text, superscript = pending[i]
+            if start > pos:
+                pieces.append((text[pos - run_start:start - run_start], None))
+            if start >= run_start:
+                pieces.append((new_text, superscript))
+            if end > run_end:
+                # Span continues into the next run.
+                pos = run_end
+                break
+            pos = end
+            i += 1
+        if pos < run_end:
+            pieces.append((text[pos - run_start:], None))
+
+        # The run itself keeps the first piece of leftover text.
+        if pieces and pieces[0][1] is None:
+            run.text = pieces.pop(0)[0]
+        else:
+            run.text = ""
+
+        prev = ref = run._r
+        for piece_text, superscript in pieces:
+            new_r = _new_run_element(ref, piece_text)
+            prev.addnext(new_r)
+            prev = new_r
+            if superscript:
+                Run(new_r, paragraph).font.superscript = True
+
+
+def _new_run_element(ref_element: CT_R, text: str) -> CT_R:
+    """Return a new ``<w:r>`` holding *text* with the formatting of *ref_element*.
+
+    Only the character formatting (``<w:rPr>``) is copied; the content is
+    a single ``<w:t>``.
     """
-    from docx.oxml.ns import qn
-    from copy import deepcopy
-    import lxml.etree as etree  # type: ignore[import-untyped]
-
-    runs = paragraph.runs
-    ref_element = runs[run_idx]._element
-
-    # Create a new <w:r> element.
-    new_r = deepcopy(ref_element)
-    # Clear the text node and set our own.
-    for t_node in new_r.findall(qn("w:t")):
-        new_r.remove(t_node)
-    new_t = etree.SubElement(new_r, qn("w:t"))
+    # Build a minimal <w:r>: copied formatting plus one text node.
+    new_r = OxmlElement("w:r")
+    rPr = ref_element.find(_W_RPR)
+    if rPr is not None:
+        new_r.append(deepcopy(rPr))
+    new_t = OxmlElement("w:t")
     new_t.text = text
     # Preserve spaces.
-    new_t.set(qn("xml:space"), "preserve")
-
-    # Insert after the reference element.
-    ref_element.addnext(new_r)
-
-    # Return the python-docx Run wrapper for the new element.
-    from docx.text.run import Run
-
-    new_run = Run(new_r, paragraph)
-    return new_run
+    new_t.set(_XML_SPACE, "preserve")
+    new_r.append(new_t)
+    return new_r
 
 
 # ---------------------------------------------------------------------------
@@ -385,7 +441,7 @@ def _format_superscript(num: int, fmt: str) -> str:
 # Main entry-point
 # ---------------------------------------------------------------------------
 
-def apply_citations(doc, config: dict) -> dict:
+def apply_citations(doc, config: dict, ctx: FormatterContext | None = None) -> dict:
     """Detect in-text citation style and convert to the target style.
 
     Args:
@@ -393,10 +449,13 @@ def apply_citations(doc, config: dict) -> dict:
         config: Journal configuration dict.  Must contain
             ``config["citation_style"]`` with keys ``type``, ``format``,
             and ``sort``.
+        ctx: Shared ``FormatterContext``; built from *doc* when omitted.
 
     Returns:
         A dict with ``"warnings"`` (list[str]) and ``"stats"`` (dict).
     """
+    if ctx is None:
+        ctx = FormatterContext.from_document(doc)
     warnings: list[str] = []
     stats: dict = {"citations_found": 0, "citations_reformatted": 0}
 
@@ -405,8 +464,16 @@ def apply_citations(doc, config: dict) -> dict:
     target_fmt = cit_config.get("format", "[{num}]")
     target_sort = cit_config.get("sort", "order_of_appearance")
 
+    # Paragraph list, heading levels and merged run text, shared by detection,
+    # extraction and replacement so each paragraph is resolved only once.
+    paragraphs = ctx.paragraphs
+    heading_levels = ctx.heading_levels
+    texts: list[str | None] = [None] * len(heading_levels)
+
     # Step 1 — detect the input style.
-    input_style = detect_input_style(doc)
+    input_style = detect_input_style(
+        doc, paragraphs=paragraphs, heading_levels=heading_levels, texts=texts
+    )
 
     # Step 2 — if already the target style, return early.
     if input_style == target_type:
@@ -414,12 +481,18 @@ def apply_citations(doc, config: dict) -> dict:
             f"Document already uses '{target_type}' citation style; no changes made."
         )
         # Still count citations for stats.
-        citations = extract_citations(doc, input_style)
+        citations = extract_citations(
+            doc, input_style, paragraphs=paragraphs,
+            heading_levels=heading_levels, texts=texts,
+        )
         stats["citations_found"] = len(citations)
         return {"warnings": warnings, "stats": stats}
 
     # Step 3 — extract citations.
-    citations = extract_citations(doc, input_style)
+    citations = extract_citations(
+        doc, input_style, paragraphs=paragraphs,
+        heading_levels=heading_levels, texts=texts,
+    )
     stats["citations_found"] = len(citations)
 
     if not citations:
@@ -442,7 +515,7 @@ def apply_citations(doc, config: dict) -> dict:
         return {"warnings": warnings, "stats": stats}
 
     # Step 5 — build citation map.
-    cit_map = build_citation_map(citations, target_type)
+    cit_map, ay_to_num = build_citation_map(citations, target_type)
 
     # Optionally sort alphabetically by author when going from author-year.
     if (
@@ -450,16 +523,34 @@ def apply_citations(doc, config: dict) -> dict:
         and input_style == "author_year"
         and target_type in ("numeric_bracket", "superscript")
     ):
-        # Re-assign numbers alphabetically by (author, year).
-        sorted_keys = sorted(
-            {(c["author"], c["year"]) for c in citations if c["author"]},
-            key=lambda ay: (ay[0].lower(), ay[1]),
+        # Re-assign numbers alphabetically by (author, year).  ay_to_num
+        # already holds each distinct pair once; lower-case every author a
+        # single time and sort plain string tuples.
+        normed = sorted(
+            (author.lower(), year, author) for author, year in ay_to_num
         )
-        alpha_map = {ay: i + 1 for i, ay in enumerate(sorted_keys)}
+        ay_to_num = {
+            (author, year): i + 1
+            for i, (_, year, author) in enumerate(normed)
+        }
         for cit in citations:
             ay = (cit.get("author"), cit.get("year"))
-            if ay in alpha_map:
-                cit_map[cit["match_text"]] = alpha_map[ay]
+            if ay in ay_to_num:
+                cit_map[cit["match_text"]] = ay_to_num[ay]
+
+    use_superscript = target_type == "superscript"
+
+    # Resolve the replacement text once per distinct citation; repeated
+    # citations then cost a single dict lookup each.
+    new_texts: dict[str, str] = {}
+    for key, num in cit_map.items():
+        if isinstance(num, int):
+            if use_superscript:
+                new_texts[key] = _format_superscript(num, target_fmt)
+            else:
+                new_texts[key] = _format_numeric_bracket(num, target_fmt)
+        else:
+            new_texts[key] = str(num)
 
     # Step 6 — perform replacements paragraph by paragraph.
     reformatted = 0
@@ -469,91 +560,72 @@ def apply_citations(doc, config: dict) -> dict:
     for cit in citations:
         by_para.setdefault(cit["para_idx"], []).append(cit)
 
-    use_superscript = target_type == "superscript"
+    for para_idx, para_cits in by_para.items():
+        para = paragraphs[para_idx]
 
-    # Track multi-citations already replaced to avoid double-processing.
-    replaced_multi: set[tuple[int, str]] = set()
+        # Replacements are collected against the paragraph's original text
+        # and applied in one pass once every citation has been mapped.
+        replacements: list[tuple[int, int, str, bool]] = []
+        superscript_runs: list[CT_R] | None = None
 
-    for para_idx, para_cits in by_para.items():
-        para = doc.paragraphs[para_idx]
-
-        # Process citations in reverse order of their position in the
-        # paragraph text so that earlier replacements don't shift offsets.
-        full_text = merge_paragraph_runs(para)
-        para_cits_sorted = sorted(
-            para_cits,
-            key=lambda c: full_text.rfind(c["match_text"]),
-            reverse=True,
-        )
+        # Entries of each multi-citation, grouped by the span they share.
+        multi_groups: dict[int, list[dict]] = {}
+        for cit in para_cits:
+            if cit.get("_is_multi"):
+                multi_groups.setdefault(cit["start"], []).append(cit)
 
-        for cit in para_cits_sorted:
+        for cit in para_cits:
             old = cit["match_text"]
 
             # Handle multi-citations: collect all numbers for the group
             if cit.get("_is_multi"):
-                multi_key = (para_idx, old)
-                if multi_key in replaced_multi:
+                # Popping the group means later entries of it are skipped.
+                group = multi_groups.pop(cit["start"], None)
+                if group is None:
                     continue
-                replaced_multi.add(multi_key)
 
                 # Gather all numbers for this multi-citation
                 multi_nums = []
-                for c in para_cits:
-                    if c.get("_is_multi") and c["match_text"] == old:
-                        n = cit_map.get(c["match_text"])
-                        # Try by author+year key
-                        ay_key_str = f"({c['author']}, {c['year']})"
-                        n = cit_map.get(ay_key_str, n)
-                        # Try looking up by individual match
-                        for k, v in cit_map.items():
-                            if c["author"] and c["author"] in k and c["year"] and c["year"] in k:
-                                n = v
-                                break
-                        if isinstance(n, int):
-                            multi_nums.append(n)
+                for c in group:
+                    n = ay_to_num.get((c["author"], c["year"]))
+                    if n is not None:
+                        multi_nums.append(n)
                 if multi_nums:
                     if use_superscript:
                         new_text = ",".join(str(n) for n in multi_nums)
                     else:
                         nums_str = ", ".join(str(n) for n in multi_nums)
                         new_text = target_fmt.format(num=nums_str)
-                    success = replace_in_runs(
-                        para, old, new_text, superscript=use_superscript
+                    replacements.append(
+                        (cit["start"], cit["end"], new_text, use_superscript)
                     )
-                    if success:
-                        reformatted += len(multi_nums)
-                    else:
-                        warnings.append(
-                            f"Could not replace multi-citation '{old}'; left unchanged."
-                        )
+                    reformatted += len(multi_nums)
                 continue
 
-            num = cit_map.get(old)
-            if num is None:
+            new_text = new_texts.get(old)
+            if new_text is None:
                 warnings.append(
                     f"Could not map citation '{old}'; left unchanged."
                 )
                 continue
 
-            if isinstance(num, int):
-                if use_superscript:
-                    new_text = _format_superscript(num, target_fmt)
-                else:
-                    new_text = _format_numeric_bracket(num, target_fmt)
-            else:
-                new_text = str(num)
-
             # Handle superscript source runs: the old text lives in a
             # superscript run without surrounding brackets, so we need to
             # also clear the superscript flag when converting away.
             if input_style == "superscript":
                 # Find the superscript run directly and replace its text.
+                if superscript_runs is None:
+                    superscript_runs = _SUPERSCRIPT_RUNS(para._p)
+                old_stripped = old.strip()
                 replaced = False
-                for run in para.runs:
-                    if run.font.superscript and run.text.strip() == old.strip():
+                for i, r in enumerate(superscript_runs):
+                    if r.text.strip() == old_stripped:
+                        run = Run(r, para)
                         run.text = new_text
                         if not use_superscript:
                             run.font.superscript = False
+                        # A rewritten run is never matched again.
+                        del superscript_runs[i]
                         replaced = True
                         break
                 if replaced:
@@ -563,15 +635,13 @@ def apply_citations(doc, config: dict) -> dict:
                         f"Could not locate superscript run for '{old}'; left unchanged."
                     )
             else:
-                success = replace_in_runs(
-                    para, old, new_text, superscript=use_superscript
+                replacements.append(
+                    (cit["start"], cit["end"], new_text, use_superscript)
                 )
-                if success:
-                    reformatted += 1
-                else:
-                    warnings.append(
-                        f"Could not replace citation '{old}' at run level; left unchanged."
-                    )
+                reformatted += 1
+
+        if replacements:
+            _rewrite_paragraph_runs(para, replacements)
 
     stats["citations_reformatted"] = reformatted
 
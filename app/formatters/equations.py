@@ -2,14 +2,21 @@
 
 from __future__ import annotations
 
+import functools
 import re
 
 from docx.shared import Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 
+from app.core.document_parser import FormatterContext
 
+
+@functools.lru_cache(maxsize=1024)
 def _int_to_roman(num: int) -> str:
-    """Convert an integer to an uppercase Roman numeral string."""
+    """Convert an integer to an uppercase Roman numeral string.
+
+    Memoised: numbering converts the same small integers for every document.
+    """
     result = []
     for value, numeral in (
         (1000, "M"), (900, "CM"), (500, "D"), (400, "CD"),
@@ -36,26 +43,18 @@ _EQUATION_NUMBER_RE = re.compile(
 )
 
 
-def _has_omath_element(paragraph) -> bool:
-    """Check if paragraph contains Office Math XML (equation object).
-
-    Office Math elements are identified by tags ending with 'oMath' or 'oMathPara'.
-    These represent actual equation objects embedded in Word documents.
-    """
-    for element in paragraph._element.iter():
-        tag = element.tag
-        if tag.endswith('}oMath') or tag.endswith('}oMathPara'):
-            return True
-    return False
-
-
-def _detect_equation_paragraphs(doc) -> list[dict]:
+def _detect_equation_paragraphs(
+    omath_paragraphs: set[int], body_paragraphs: list[tuple[int, object]]
+) -> list[dict]:
     """Return list of equation paragraphs with metadata.
 
     Detects equations in two modes:
     1. Office Math XML elements (actual equation objects)
     2. Text-based equation numbers (standalone paragraphs with numbers like "(1)")
 
+    *omath_paragraphs* holds the indices of paragraphs with Office Math
+    elements (``FormatterContext.omath_paragraphs``).
+
     Returns:
         List of dicts with keys:
             - para: paragraph object
@@ -65,13 +64,10 @@ def _detect_equation_paragraphs(doc) -> list[dict]:
     """
     equations = []
 
-    for idx, para in enumerate(doc.paragraphs):
-        # Skip heading paragraphs
-        if para.style.name and para.style.name.startswith("Heading"):
-            continue
-
+    # Heading paragraphs are already filtered out of *body_paragraphs*
+    for idx, para in body_paragraphs:
         # Mode 1: Office Math elements
-        if _has_omath_element(para):
+        if idx in omath_paragraphs:
             equations.append({
                 "para": para,
                 "para_idx": idx,
@@ -82,7 +78,9 @@ def _detect_equation_paragraphs(doc) -> list[dict]:
 
         # Mode 2: Text-based equation numbers
         text = para.text.strip()
-        match = _EQUATION_NUMBER_RE.match(text)
+        # A standalone equation number always ends with ")"; most body
+        # paragraphs are ruled out here without running the regex.
+        match = text[-1:] == ")" and _EQUATION_NUMBER_RE.match(text)
         if match:
             # Only consider if paragraph is relatively isolated
             # (likely a standalone equation number)
@@ -150,11 +148,12 @@ def _apply_equation_spacing(paragraph, spacing_before: int, spacing_after: int)
         spacing_before: points before paragraph
         spacing_after: points after paragraph
     """
+    paragraph_format = paragraph.paragraph_format
     if spacing_before is not None:
-        paragraph.paragraph_format.space_before = Pt(spacing_before)
+        paragraph_format.space_before = Pt(spacing_before)
 
     if spacing_after is not None:
-        paragraph.paragraph_format.space_after = Pt(spacing_after)
+        paragraph_format.space_after = Pt(spacing_after)
 
 
 def _apply_equation_font_size(paragraph, font_size: float) -> None:
@@ -172,27 +171,37 @@ def _apply_equation_font_size(paragraph, font_size: float) -> None:
         run.font.size = size_pt
 
 
-def _update_equation_number_text(paragraph, new_number: str, warnings: list[str]) -> None:
+def _update_equation_number_text(
+    paragraph, new_number: str, warnings: list[str], font_size: float | None = None
+) -> None:
     """Update the text of an equation number paragraph.
 
     Args:
         paragraph: docx paragraph object containing equation number
         new_number: formatted equation number to replace
         warnings: list to append warnings to
+        font_size: font size in points applied to every run in the same
+            pass (or None to skip)
     """
+    size_pt = Pt(font_size) if font_size is not None else None
     try:
-        if paragraph.runs:
+        runs = paragraph.runs
+        if runs:
             # Put the new number in the first run and clear the rest
-            paragraph.runs[0].text = new_number
-            for run in paragraph.runs[1:]:
-                run.text = ""
+            for i, run in enumerate(runs):
+                run.text = "" if i else new_number
+                if size_pt is not None:
+                    run.font.size = size_pt
         else:
             paragraph.text = new_number
+            if size_pt is not None:
+                for run in paragraph.runs:
+                    run.font.size = size_pt
     except Exception as e:
         warnings.append(f"Could not update equation number text: {str(e)}")
 
 
-def apply_equations(doc, config) -> dict:
+def apply_equations(doc, config, ctx: FormatterContext | None = None) -> dict:
     """Apply equation formatting to all equations in *doc*.
 
     Reads ``config["equations"]`` with keys:
@@ -212,10 +221,13 @@ def apply_equations(doc, config) -> dict:
     Args:
         doc: A python-docx ``Document`` object.
         config: Journal configuration dict.
+        ctx: Shared ``FormatterContext``; built from *doc* when omitted.
 
     Returns:
         dict with ``"warnings"`` (list[str]) and ``"stats"`` (dict).
     """
+    if ctx is None:
+        ctx = FormatterContext.from_document(doc)
     warnings: list[str] = []
     equations_config = config.get("equations", {})
 
@@ -227,7 +239,7 @@ def apply_equations(doc, config) -> dict:
     font_size = equations_config.get("font_size", None)
 
     # Detect all equations
-    equations = _detect_equation_paragraphs(doc)
+    equations = _detect_equation_paragraphs(ctx.omath_paragraphs, ctx.body_paragraphs)
 
     if not equations:
         warnings.append("No equations found in document")
@@ -250,15 +262,18 @@ def apply_equations(doc, config) -> dict:
             # Apply spacing
             _apply_equation_spacing(para, spacing_before, spacing_after)
 
-            # Apply font size if specified
-            if font_size is not None:
+            renumber = eq_type == "numbered_text" and numbering == "sequential"
+
+            # Apply font size if specified (renumbered paragraphs get it
+            # while their runs are rewritten)
+            if font_size is not None and not renumber:
                 _apply_equation_font_size(para, font_size)
 
             # Handle numbering for text-based equation numbers
-            if eq_type == "numbered_text" and numbering == "sequential":
+            if renumber:
                 equation_number += 1
                 new_number = _format_equation_number(equation_number, equations_config)
-                _update_equation_number_text(para, new_number, warnings)
+                _update_equation_number_text(para, new_number, warnings, font_size)
             elif eq_type == "omath":
                 # For Office Math elements, we don't modify the equation itself,
                 # just apply formatting (alignment, spacing, font size)
@@ -6,6 +6,8 @@ import re
 
 from docx.shared import Pt
 
+from app.core.document_parser import FormatterContext
+
 
 # Matches "Figure 1", "Fig. 2", "Fig 3", etc. at the start of a paragraph.
 _FIGURE_CAPTION_RE = re.compile(
@@ -14,17 +16,21 @@ _FIGURE_CAPTION_RE = re.compile(
 )
 
 
-def _reformat_caption_text(text: str, prefix: str, number: int) -> str:
+def _reformat_caption_text(
+    text: str, match: re.Match, prefix: str, number: int
+) -> str:
     """Replace the figure label in *text* with the configured prefix and number.
 
+    *match* is the ``_FIGURE_CAPTION_RE`` match for the label at the start
+    of *text*; its span is reused rather than matching again.
+
     For example ``"Fig. 1 - Overview"`` with prefix ``"Figure"`` becomes
     ``"Figure 1 - Overview"``.
     """
-    new_label = f"{prefix} {number}"
-    return _FIGURE_CAPTION_RE.sub(new_label, text, count=1)
+    return f"{prefix} {number}{text[match.end():]}"
 
 
-def apply_figures(doc, config) -> dict:
+def apply_figures(doc, config, ctx: FormatterContext | None = None) -> dict:
     """Apply figure caption formatting to all recognised figure captions.
 
     Reads ``config["figures"]`` with keys:
@@ -40,10 +46,13 @@ def apply_figures(doc, config) -> dict:
     Args:
         doc: A python-docx ``Document`` object.
         config: Journal configuration dict.
+        ctx: Shared ``FormatterContext``; built from *doc* when omitted.
 
     Returns:
         dict with ``"warnings"`` (list[str]) and ``"stats"`` (dict).
     """
+    if ctx is None:
+        ctx = FormatterContext.from_document(doc)
     warnings: list[str] = []
     figures_config = config.get("figures", {})
 
@@ -53,28 +62,36 @@ def apply_figures(doc, config) -> dict:
 
     figure_number = 0
 
-    for paragraph in doc.paragraphs:
-        text = paragraph.text.strip()
-        if not _FIGURE_CAPTION_RE.match(text):
+    for paragraph in ctx.paragraphs:
+        raw_text = paragraph.text
+        text = raw_text.strip()
+        # Every caption label starts with "f"/"F"; skip the regex otherwise.
+        match = text[:1] in ("f", "F") and _FIGURE_CAPTION_RE.match(text)
+        if not match:
             continue
 
         figure_number += 1
 
         # --- Reformat caption text ---
-        new_text = _reformat_caption_text(paragraph.text, prefix, figure_number)
+        # The label is only rewritten when it opens the paragraph text;
+        # a caption indented with leading whitespace keeps its wording.
+        if raw_text[:1] == text[:1]:
+            new_text = _reformat_caption_text(raw_text, match, prefix, figure_number)
+        else:
+            new_text = raw_text
 
-        if paragraph.runs:
+        # --- Apply caption font size to all runs (same pass) ---
+        runs = paragraph.runs
+        if runs:
             # Put the full reformatted text into the first run and clear the
             # rest so we don't duplicate content.
-            paragraph.runs[0].text = new_text
-            for run in paragraph.runs[1:]:
-                run.text = ""
+            for i, run in enumerate(runs):
+                run.text = "" if i else new_text
+                run.font.size = size_pt
         else:
             paragraph.text = new_text
-
-        # --- Apply caption font size to all runs ---
-        for run in paragraph.runs:
-            run.font.size = size_pt
+            for run in paragraph.runs:
+                run.font.size = size_pt
 
     return {
         "warnings": warnings,
@@ -1,9 +1,45 @@
 """Font formatter: applies body font family and size to non-heading paragraphs."""
 
-from docx.shared import Pt
+from docx.oxml.ns import qn
+from docx.shared import Emu, Pt
 
+from app.core.document_parser import FormatterContext
 
-def apply_fonts(doc, config):
+
+_W_ASCII = qn("w:ascii")
+_W_HANSI = qn("w:hAnsi")
+_W_VAL = qn("w:val")
+
+
+def _half_points(size_pt):
+    """Return the ``w:sz`` value (half-points) for the length *size_pt*."""
+    return str(int(Emu(size_pt).pt * 2))
+
+
+def _format_body_runs(paragraph, family, size_half_points):
+    """Apply the body font to every run of *paragraph*.
+
+    Writes ``w:rFonts`` (ascii/hAnsi) and ``w:sz`` on each run's ``w:rPr``
+    directly; *size_half_points* comes from :func:`_half_points`.  No other
+    run properties are touched, so existing bold, italic, and underline
+    state is preserved.
+
+    Returns:
+        The number of runs modified.
+    """
+    runs = paragraph._p.r_lst
+
+    for r in runs:
+        rPr = r.get_or_add_rPr()
+        rFonts = rPr.get_or_add_rFonts()
+        rFonts.set(_W_ASCII, family)
+        rFonts.set(_W_HANSI, family)
+        rPr.get_or_add_sz().set(_W_VAL, size_half_points)
+
+    return len(runs)
+
+
+def apply_fonts(doc, config, ctx=None):
     """Apply body font settings to all non-heading paragraphs.
 
     Reads config["fonts"]["body"] with keys:
@@ -11,54 +47,39 @@ def apply_fonts(doc, config):
         size: float (in pt, e.g. 12.0)
 
     Preserves existing bold, italic, and underline state on each run.
+    A ``null`` body entry switches the formatter off.
 
     Args:
         doc: A python-docx Document object.
         config: Journal configuration dict.
+        ctx: Shared FormatterContext; built from doc when omitted.
 
     Returns:
         dict with "warnings" (list[str]) and "stats" (dict).
     """
-    warnings = []
-    stats = {}
-
     fonts_config = config.get("fonts", {})
     body_config = fonts_config.get("body", {})
+    if body_config is None:
+        return {"warnings": [], "stats": {}}
+
+    if ctx is None:
+        ctx = FormatterContext.from_document(doc)
+    warnings = []
+    stats = {}
 
     family = body_config.get("family", "Times New Roman")
     size = body_config.get("size", 12.0)
-    size_pt = Pt(size)
+    size_half_points = _half_points(Pt(size))
 
     paragraphs_modified = 0
     runs_modified = 0
 
-    for paragraph in doc.paragraphs:
-        # Skip headings — their formatting is handled by apply_headings
-        if paragraph.style.name.startswith("Heading"):
-            continue
-
-        paragraph_touched = False
-
-        for run in paragraph.runs:
-            # Preserve existing bold, italic, underline state
-            existing_bold = run.bold
-            existing_italic = run.italic
-            existing_underline = run.underline
-
-            # Apply body font settings
-            run.font.name = family
-            run.font.size = size_pt
-
-            # Restore preserved formatting
-            run.bold = existing_bold
-            run.italic = existing_italic
-            run.underline = existing_underline
-
-            runs_modified += 1
-            paragraph_touched = True
-
-        if paragraph_touched:
+    # Headings are skipped — their formatting is handled by apply_headings
+    for _, paragraph in ctx.body_paragraphs:
+        modified = _format_body_runs(paragraph, family, size_half_points)
+        if modified:
             paragraphs_modified += 1
+            runs_modified += modified
 
     stats["font_family"] = family
     stats["font_size_pt"] = size
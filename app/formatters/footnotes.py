@@ -6,37 +6,10 @@ This formatter detects footnotes via XML and generates informational warnings.
 
 from __future__ import annotations
 
+from app.core.document_parser import FormatterContext
 
-def _detect_footnote_references(doc) -> list[dict]:
-    """Scan document XML for footnote reference elements.
 
-    Looks for w:footnoteReference elements in paragraph runs.
-    Uses XML iteration with element.tag.endswith('}footnoteReference').
-
-    Returns list of footnote metadata (id, para_idx).
-    """
-    footnotes = []
-
-    for para_idx, paragraph in enumerate(doc.paragraphs):
-        for run in paragraph.runs:
-            # Check for footnote reference elements in the run's XML
-            for element in run._element.iter():
-                tag = element.tag
-                # Look for footnoteReference elements
-                if tag.endswith('}footnoteReference'):
-                    footnote_id = element.get(
-                        '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}id',
-                        'unknown'
-                    )
-                    footnotes.append({
-                        "id": footnote_id,
-                        "para_idx": para_idx,
-                    })
-
-    return footnotes
-
-
-def apply_footnotes(doc, config) -> dict:
+def apply_footnotes(doc, config, ctx: FormatterContext | None = None) -> dict:
     """Validate and report on footnotes (read-only).
 
     NOTE: python-docx cannot create, modify, or renumber footnotes.
@@ -53,6 +26,7 @@ def apply_footnotes(doc, config) -> dict:
     Args:
         doc: A python-docx ``Document`` object.
         config: Journal configuration dict.
+        ctx: Shared ``FormatterContext``; built from *doc* when omitted.
 
     Returns:
         dict with ``"warnings"`` (list[str]) and ``"stats"`` (dict).
@@ -68,7 +42,9 @@ def apply_footnotes(doc, config) -> dict:
     max_per_page = footnotes_config.get("max_per_page")
 
     # Detect footnotes
-    footnotes = _detect_footnote_references(doc)
+    if ctx is None:
+        ctx = FormatterContext.from_document(doc)
+    footnotes = ctx.footnote_references
     footnotes_found = len(footnotes)
 
     if footnotes_found > 0:
@@ -1,31 +1,61 @@
 """Heading formatter: applies font, spacing, alignment, color, and optional numbering to headings."""
 
+import functools
+
 from docx.shared import Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 
+from app.core.document_parser import FormatterContext
+
 
 ALIGNMENT_MAP = {
     "left": WD_ALIGN_PARAGRAPH.LEFT,
     "center": WD_ALIGN_PARAGRAPH.CENTER,
 }
 
+# Style name -> (config key, numbering depth index).
 HEADING_LEVELS = {
-    "Heading 1": "heading_1",
-    "Heading 2": "heading_2",
-    "Heading 3": "heading_3",
+    "Heading 1": ("heading_1", 0),
+    "Heading 2": ("heading_2", 1),
+    "Heading 3": ("heading_3", 2),
 }
 
+# Text after the number by depth: "1. " for top-level headings, "1.2 " below.
+_NUMBER_SUFFIX = (". ", " ", " ")
+
 
+@functools.lru_cache(maxsize=32)
 def _parse_hex_color(hex_string):
-    """Convert a hex color string like '#FF0000' to an RGBColor."""
-    hex_string = hex_string.lstrip("#")
-    r = int(hex_string[0:2], 16)
-    g = int(hex_string[2:4], 16)
-    b = int(hex_string[4:6], 16)
+    """Convert a hex color string like '#FF0000' to an RGBColor.
+
+    Memoised: journals reuse a handful of colors and ``RGBColor`` is an
+    immutable tuple, so the parsed value can be shared.
+    """
+    r, g, b = bytes.fromhex(hex_string.lstrip("#")[:6])
     return RGBColor(r, g, b)
 
 
-def apply_headings(doc, config):
+def _heading_settings(heading_config):
+    """Resolve one heading level's config into ready-to-assign values.
+
+    Lengths and colors are converted once per level rather than once per
+    heading paragraph.
+    """
+    alignment_name = heading_config.get("alignment", "left").lower()
+    return {
+        "family": heading_config.get("family", "Times New Roman"),
+        "size": Pt(heading_config.get("size", 14.0)),
+        "bold": heading_config.get("bold", True),
+        "italic": heading_config.get("italic", False),
+        "color": _parse_hex_color(heading_config.get("color", "#000000")),
+        "space_before": Pt(heading_config.get("spacing_before", 12.0)),
+        "space_after": Pt(heading_config.get("spacing_after", 6.0)),
+        "alignment_name": alignment_name,
+        "alignment": ALIGNMENT_MAP.get(alignment_name),
+    }
+
+
+def apply_headings(doc, config, ctx=None):
     """Apply heading-level formatting to Heading 1, 2, and 3 paragraphs.
 
     Reads config["fonts"] for heading_1, heading_2, heading_3 — each with:
@@ -44,10 +74,13 @@ def apply_headings(doc, config):
     Args:
         doc: A python-docx Document object.
         config: Journal configuration dict.
+        ctx: Shared FormatterContext; built from doc when omitted.
 
     Returns:
         dict with "warnings" (list[str]) and "stats" (dict).
     """
+    if ctx is None:
+        ctx = FormatterContext.from_document(doc)
     warnings = []
     stats = {}
 
@@ -57,79 +90,71 @@ def apply_headings(doc, config):
     # Counters for heading numbering: level 1, 2, 3
     counters = [0, 0, 0]
     headings_formatted = {"Heading 1": 0, "Heading 2": 0, "Heading 3": 0}
+    # Resolved settings per config key, filled the first time a level is seen.
+    heading_settings = {}
 
-    for paragraph in doc.paragraphs:
-        style_name = paragraph.style.name
-
-        if style_name not in HEADING_LEVELS:
+    for paragraph, style_name in zip(ctx.paragraphs, ctx.style_names):
+        entry = HEADING_LEVELS.get(style_name)
+        if entry is None:
             continue
 
-        config_key = HEADING_LEVELS[style_name]
-        heading_config = fonts_config.get(config_key)
+        config_key, depth = entry
+        settings = heading_settings.get(config_key)
 
-        if heading_config is None:
-            warnings.append(
-                f"No configuration found for '{config_key}', "
-                f"skipping formatting for '{style_name}'."
-            )
-            continue
+        if settings is None:
+            heading_config = fonts_config.get(config_key)
+            if heading_config is None:
+                warnings.append(
+                    f"No configuration found for '{config_key}', "
+                    f"skipping formatting for '{style_name}'."
+                )
+                continue
+            settings = heading_settings[config_key] = _heading_settings(heading_config)
 
         # --- Heading numbering ---
         if heading_numbering:
-            if style_name == "Heading 1":
-                counters[0] += 1
-                counters[1] = 0
-                counters[2] = 0
-                prefix = f"{counters[0]}. "
-            elif style_name == "Heading 2":
-                counters[1] += 1
-                counters[2] = 0
-                prefix = f"{counters[0]}.{counters[1]} "
-            elif style_name == "Heading 3":
-                counters[2] += 1
-                prefix = f"{counters[0]}.{counters[1]}.{counters[2]} "
-            else:
-                prefix = ""
+            counters[depth] += 1
+            counters[depth + 1:] = [0] * (2 - depth)
+            prefix = ".".join(map(str, counters[: depth + 1])) + _NUMBER_SUFFIX[depth]
 
             # Prepend the number prefix to the first run's text, or insert a
             # new run if the paragraph has no runs.
-            if paragraph.runs:
-                paragraph.runs[0].text = prefix + paragraph.runs[0].text
+            runs = paragraph.runs
+            if runs:
+                runs[0].text = prefix + runs[0].text
             else:
                 paragraph.text = prefix + paragraph.text
 
         # --- Font family, size, bold, italic on every run ---
-        family = heading_config.get("family", "Times New Roman")
-        size = Pt(heading_config.get("size", 14.0))
-        bold = heading_config.get("bold", True)
-        italic = heading_config.get("italic", False)
-        color_hex = heading_config.get("color", "#000000")
-        color = _parse_hex_color(color_hex)
+        family = settings["family"]
+        size = settings["size"]
+        bold = settings["bold"]
+        italic = settings["italic"]
+        color = settings["color"]
 
         for run in paragraph.runs:
-            run.font.name = family
-            run.font.size = size
-            run.font.bold = bold
-            run.font.italic = italic
-            run.font.color.rgb = color
+            font = run.font
+            font.name = family
+            font.size = size
+            font.bold = bold
+            font.italic = italic
+            font.color.rgb = color
 
         # --- Paragraph spacing ---
-        spacing_before = heading_config.get("spacing_before", 12.0)
-        spacing_after = heading_config.get("spacing_after", 6.0)
-        paragraph.paragraph_format.space_before = Pt(spacing_before)
-        paragraph.paragraph_format.space_after = Pt(spacing_after)
+        paragraph_format = paragraph.paragraph_format
+        paragraph_format.space_before = settings["space_before"]
+        paragraph_format.space_after = settings["space_after"]
 
         # --- Alignment ---
-        alignment_name = heading_config.get("alignment", "left").lower()
-        alignment = ALIGNMENT_MAP.get(alignment_name)
+        alignment = settings["alignment"]
         if alignment is not None:
-            paragraph.paragraph_format.alignment = alignment
+            paragraph_format.alignment = alignment
         else:
             warnings.append(
-                f"Unknown alignment '{alignment_name}' for {style_name}, "
+                f"Unknown alignment '{settings['alignment_name']}' for {style_name}, "
                 "defaulting to left."
             )
-            paragraph.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.LEFT
+            paragraph_format.alignment = WD_ALIGN_PARAGRAPH.LEFT
 
         headings_formatted[style_name] += 1
 
@@ -6,7 +6,22 @@ import re
 
 from docx.shared import Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml.ns import nsmap
+from lxml import etree
 
+from app.core.document_parser import FormatterContext, replace_paragraph_text
+
+
+# Splits a keywords line into its heading ("Keywords: ") and the list.
+_KEYWORDS_RE = re.compile(r"^(keywords?\s*[:.]?\s*)(.*)", re.IGNORECASE)
+
+# Body paragraphs whose text contains "keyword" in any case (U+212A KELVIN
+# SIGN lower-cases to "k" in Python, so it is folded too).  A superset of
+# the paragraphs _find_keywords_paragraph accepts, evaluated in C.
+_KEYWORD_CANDIDATES = etree.XPath(
+    "./w:p[contains(translate(., 'KEYWORD\u212a', 'keywordk'), 'keyword')]",
+    namespaces={"w": nsmap["w"]},
+)
 
 ALIGNMENT_MAP = {
     "left": WD_ALIGN_PARAGRAPH.LEFT,
@@ -17,23 +32,34 @@ ALIGNMENT_MAP = {
 
 def _apply_alignment(paragraph, alignment_name: str) -> None:
     """Set *paragraph* alignment from a string like ``"center"`` or ``"left"``."""
-    alignment = ALIGNMENT_MAP.get(alignment_name.lower())
+    # Configs spell these in lower case; only lower-case on a miss.
+    alignment = ALIGNMENT_MAP.get(alignment_name)
+    if alignment is None:
+        alignment = ALIGNMENT_MAP.get(alignment_name.lower())
     if alignment is not None:
         paragraph.paragraph_format.alignment = alignment
 
 
-def _find_keywords_paragraph(doc):
+def _find_keywords_paragraph(paragraphs: list, body):
     """Return the paragraph that contains the keywords line.
 
     Looks for a paragraph whose text starts with "keyword" (case-insensitive).
+    Only paragraphs that mention "keyword" at all (one XPath query over the
+    *body* element) have their text assembled and checked.
     """
-    for paragraph in doc.paragraphs:
-        if paragraph.text.strip().lower().startswith("keyword"):
+    candidates = set(_KEYWORD_CANDIDATES(body))
+    if not candidates:
+        return None
+    for paragraph in paragraphs:
+        if (
+            paragraph._p in candidates
+            and paragraph.text.strip().lower().startswith("keyword")
+        ):
             return paragraph
     return None
 
 
-def apply_keywords(doc, config) -> dict:
+def apply_keywords(doc, config, ctx: FormatterContext | None = None) -> dict:
     """Enhanced keywords formatting.
 
     Reads ``config["keywords"]`` with keys:
@@ -47,6 +73,7 @@ def apply_keywords(doc, config) -> dict:
     Args:
         doc: A python-docx ``Document`` object.
         config: Journal configuration dict.
+        ctx: Shared ``FormatterContext``; built from *doc* when omitted.
 
     Returns:
         dict with ``"warnings"`` (list[str]) and ``"stats"`` (dict).
@@ -58,7 +85,9 @@ def apply_keywords(doc, config) -> dict:
     if keywords_config is None:
         return {"warnings": [], "stats": {"keywords_count": 0}}
 
-    keywords_para = _find_keywords_paragraph(doc)
+    if ctx is None:
+        ctx = FormatterContext.from_document(doc)
+    keywords_para = _find_keywords_paragraph(ctx.paragraphs, ctx.body)
 
     if keywords_para is None:
         # Keywords are optional, so don't warn if not found
@@ -74,11 +103,7 @@ def apply_keywords(doc, config) -> dict:
 
     text = keywords_para.text
     # Split into heading part and keywords part
-    kw_match = re.match(
-        r"^(keywords?\s*[:.]?\s*)(.*)",
-        text,
-        re.IGNORECASE,
-    )
+    kw_match = _KEYWORDS_RE.match(text)
 
     if kw_match:
         _heading_part = kw_match.group(1)
@@ -100,12 +125,7 @@ def apply_keywords(doc, config) -> dict:
         new_text = heading_text + " " + keywords_body
 
         # Replace text
-        if keywords_para.runs:
-            keywords_para.runs[0].text = new_text
-            for run in keywords_para.runs[1:]:
-                run.text = ""
-        else:
-            keywords_para.text = new_text
+        replace_paragraph_text(keywords_para, new_text)
 
         # Apply formatting
         for run in keywords_para.runs:
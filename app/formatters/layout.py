@@ -1,7 +1,9 @@
 """Layout formatter: applies page margins, page size, and line spacing."""
 
-from docx.shared import Inches, Pt
-from docx.enum.text import WD_LINE_SPACING
+from docx.shared import Emu, Inches, Pt, Twips
+from docx.oxml.ns import qn
+
+from app.core.document_parser import FormatterContext
 
 
 PAGE_SIZES = {
@@ -10,27 +12,12 @@ PAGE_SIZES = {
 }
 
 
-def apply_layout(doc, config):
-    """Apply page layout settings to the document.
-
-    Reads config["page_layout"] with keys:
-        margins: dict with top, bottom, left, right (in inches)
-        page_size: "letter" or "a4"
-        line_spacing: float (1.0, 1.5, 2.0, etc.)
-        columns: int (informational only)
-
-    Args:
-        doc: A python-docx Document object.
-        config: Journal configuration dict.
+def _apply_page_setup(sections, layout, warnings, stats):
+    """Apply page size and margins to *sections*, and warn about column requests.
 
-    Returns:
-        dict with "warnings" (list[str]) and "stats" (dict).
+    Fills *warnings* and *stats* in place; line spacing is left to the
+    caller since it is applied per paragraph.
     """
-    warnings = []
-    stats = {}
-
-    layout = config.get("page_layout", {})
-
     # --- Page size ---
     page_size_name = layout.get("page_size", "letter").lower()
     if page_size_name in PAGE_SIZES:
@@ -41,7 +28,7 @@ def apply_layout(doc, config):
         )
         width, height = PAGE_SIZES["letter"]
 
-    for section in doc.sections:
+    for section in sections:
         section.page_width = width
         section.page_height = height
 
@@ -54,7 +41,7 @@ def apply_layout(doc, config):
     margin_left = Inches(margins.get("left", 1.0))
     margin_right = Inches(margins.get("right", 1.0))
 
-    for section in doc.sections:
+    for section in sections:
         section.top_margin = margin_top
         section.bottom_margin = margin_bottom
         section.left_margin = margin_left
@@ -67,15 +54,6 @@ def apply_layout(doc, config):
         "right": margins.get("right", 1.0),
     }
 
-    # --- Line spacing ---
-    line_spacing_value = layout.get("line_spacing", 1.0)
-
-    for paragraph in doc.paragraphs:
-        paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.MULTIPLE
-        paragraph.paragraph_format.line_spacing = line_spacing_value
-
-    stats["line_spacing"] = line_spacing_value
-
     # --- Columns (informational only) ---
     columns = layout.get("columns", 1)
     if columns > 1:
@@ -90,4 +68,67 @@ def apply_layout(doc, config):
         )
     stats["columns"] = columns
 
+
+_W_LINE = qn("w:line")
+_W_LINE_RULE = qn("w:lineRule")
+
+
+def _line_spacing_twips(line_spacing_value):
+    """Return the ``w:line`` value for a multiple of single line spacing."""
+    return str(Emu(line_spacing_value * Twips(240)).twips)
+
+
+def _apply_line_spacing(p, line_twips):
+    """Set multiple line spacing on the ``w:p`` element *p*.
+
+    *line_twips* comes from :func:`_line_spacing_twips`.  The ``w:spacing``
+    attributes are written directly, which produces the same XML as
+    ``paragraph_format.line_spacing`` without re-converting the value and
+    re-resolving ``w:pPr`` through the property setters for every paragraph.
+    """
+    spacing = p.get_or_add_pPr().get_or_add_spacing()
+    spacing.set(_W_LINE_RULE, "auto")
+    spacing.set(_W_LINE, line_twips)
+
+
+def apply_layout(doc, config, ctx=None):
+    """Apply page layout settings to the document.
+
+    Reads config["page_layout"] with keys:
+        margins: dict with top, bottom, left, right (in inches)
+        page_size: "letter" or "a4"
+        line_spacing: float (1.0, 1.5, 2.0, etc.)
+        columns: int (informational only)
+
+    A ``null`` page_layout switches the formatter off (the defaults above
+    apply only when the key is absent).
+
+    Args:
+        doc: A python-docx Document object.
+        config: Journal configuration dict.
+        ctx: Shared FormatterContext; built from doc when omitted.
+
+    Returns:
+        dict with "warnings" (list[str]) and "stats" (dict).
+    """
+    layout = config.get("page_layout", {})
+    if layout is None:
+        return {"warnings": [], "stats": {}}
+
+    if ctx is None:
+        ctx = FormatterContext.from_document(doc)
+    warnings = []
+    stats = {}
+
+    _apply_page_setup(ctx.sections, layout, warnings, stats)
+
+    # --- Line spacing ---
+    line_spacing_value = layout.get("line_spacing", 1.0)
+    line_twips = _line_spacing_twips(line_spacing_value)
+
+    for paragraph in ctx.paragraphs:
+        _apply_line_spacing(paragraph._p, line_twips)
+
+    stats["line_spacing"] = line_spacing_value
+
     return {"warnings": warnings, "stats": stats}
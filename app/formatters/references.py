@@ -2,27 +2,36 @@
 
 from __future__ import annotations
 
+import functools
 import re
 
-from docx.shared import Pt, Inches
+from docx.oxml.ns import nsmap, qn
+from docx.shared import Inches, Length, Pt
+from lxml import etree
 
-from app.core.document_parser import find_section_by_heading, is_reference_heading
+from app.core.document_parser import (
+    FormatterContext,
+    get_all_sections,
+    is_reference_heading,
+    replace_paragraph_text,
+)
+from app.formatters.fonts import _half_points
 
 
-# ---------------------------------------------------------------------------
-# Common reference-section heading names (passed to find_section_by_heading)
-# ---------------------------------------------------------------------------
+_W_VAL = qn("w:val")
+
+# Unparseable entries reported one by one; the rest are summarised in a
+# single warning so a malformed list doesn't flood the report.
+_MAX_PARSE_WARNINGS = 20
 
-_REF_HEADINGS = [
-    "References",
-    "Bibliography",
-    "Works Cited",
-    "Literature Cited",
-    "Citations",
-    "Reference List",
-    "Cited Literature",
-    "Literature References",
-]
+# True when a paragraph holds any text that could survive ``.strip()``:
+# a ``w:t`` with non-whitespace content, or a non-breaking hyphen (which
+# python-docx renders as "-").  Blank spacer paragraphs fail this in one
+# lxml call, before ``paragraph.text`` joins their runs.
+_HAS_VISIBLE_TEXT = etree.XPath(
+    "boolean(.//w:t[normalize-space()] | .//w:noBreakHyphen)",
+    namespaces={"w": nsmap["w"]},
+)
 
 
 # ---------------------------------------------------------------------------
@@ -51,26 +60,66 @@ _VOL_PAGES_RE = re.compile(
 # Numbered reference prefix: "1. ", "1) ", "[1] "
 _NUMBER_PREFIX_RE = re.compile(r'^\s*(?:\[?\d+[\].)]\s*)')
 
+# Characters that may end a title sentence before ". " (an upper-case
+# letter there is more likely an initial such as "J.").
+_TITLE_END_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz?!")
+
+# Template placeholders understood by format_reference.
+_PLACEHOLDER_RE = re.compile(
+    r'\{(num|authors|year|title|journal|volume|issue|pages|doi)\}'
+)
+
+# Clean-up of artefacts left by empty template fields.
+_EMPTY_PAREN_RE = re.compile(r'\(\)')
+_DOUBLE_COMMA_RE = re.compile(r',\s*,')
+_DOUBLE_PERIOD_RE = re.compile(r'\.\s*\.')
+_COMMA_PERIOD_RE = re.compile(r',\s*\.')
+_WS_COLLAPSE_RE = re.compile(r'\s{2,}')
+
 
 # ---------------------------------------------------------------------------
 # Section finder
 # ---------------------------------------------------------------------------
 
-def find_references_section(doc) -> tuple[int, int] | None:
+def find_references_section(
+    doc, paragraphs: list | None = None, style_names: list[str] | None = None
+) -> tuple[int, int] | None:
     """Locate the references / bibliography section in the document.
 
     Returns a ``(start_idx, end_idx)`` tuple of paragraph indices, or
     ``None`` if no matching heading is found.  *start_idx* is the heading
     paragraph itself; the actual reference entries start at
     ``start_idx + 1``.
+
+    Each heading is lowercased once and looked up in the shared set of
+    reference-heading names (see ``is_reference_heading``).
     """
-    return find_section_by_heading(doc, _REF_HEADINGS)
+    for section in get_all_sections(doc, paragraphs, style_names):
+        if is_reference_heading(section["heading"]):
+            return (section["start"], section["end"])
+    return None
 
 
 # ---------------------------------------------------------------------------
 # Reference parser
 # ---------------------------------------------------------------------------
 
+def _split_title_journal(text: str) -> tuple[str, str] | None:
+    """Split *text* at the first sentence-ending period.
+
+    A period counts when it follows a lower-case letter, "?" or "!" and is
+    followed by whitespace.  Returns ``(title, journal)`` with the
+    whitespace left on the journal side, or ``None`` if there is no such
+    period.
+    """
+    dot = text.find(".", 1)
+    while dot >= 0:
+        if text[dot - 1] in _TITLE_END_CHARS and text[dot + 1:dot + 2].isspace():
+            return text[:dot], text[dot + 1:]
+        dot = text.find(".", dot + 1)
+    return None
+
+
 def parse_reference(text: str) -> dict | None:
     """Best-effort parse of a reference string into structured fields.
 
@@ -94,7 +143,9 @@ def parse_reference(text: str) -> dict | None:
         remaining = remaining.strip().rstrip(".")
 
     # --- Year ---
-    year_match = _YEAR_PAREN_RE.search(remaining)
+    # The parenthesised forms need a "(" somewhere; without one the first
+    # scan is skipped and only the plain pattern runs.
+    year_match = _YEAR_PAREN_RE.search(remaining) if "(" in remaining else None
     if year_match:
         fields["year"] = year_match.group(1)
         year_pos = year_match.start()
@@ -116,7 +167,7 @@ def parse_reference(text: str) -> dict | None:
         fields["authors"] = before_year.strip()
 
     # --- Volume, issue, pages ---
-    vim = _VOL_ISSUE_PAGES_RE.search(after_year)
+    vim = _VOL_ISSUE_PAGES_RE.search(after_year) if "(" in after_year else None
     if vim:
         fields["volume"] = vim.group(1)
         fields["issue"] = vim.group(2)
@@ -139,11 +190,11 @@ def parse_reference(text: str) -> dict | None:
     if pre_vol:
         # Split on first period that is likely a sentence boundary
         # (not initials like "J." or "U.S.").
-        parts = re.split(r'(?<=[a-z\?\!])\.\s+', pre_vol, maxsplit=1)
-        if len(parts) == 2:
+        parts = _split_title_journal(pre_vol)
+        if parts is not None:
             fields["title"] = parts[0].strip().rstrip(".")
             fields["journal"] = parts[1].strip().rstrip(",. ")
-        elif len(parts) == 1:
+        else:
             # Only one chunk: try splitting on the last comma.
             comma_parts = pre_vol.rsplit(",", 1)
             if len(comma_parts) == 2 and len(comma_parts[1].strip()) > 2:
@@ -163,6 +214,23 @@ def parse_reference(text: str) -> dict | None:
 # Reference formatter
 # ---------------------------------------------------------------------------
 
+@functools.lru_cache(maxsize=32)
+def _compile_template(template: str) -> tuple[tuple[str, str | None], ...]:
+    """Split *template* into ``(literal, placeholder)`` pairs.
+
+    Memoised: a journal's template is the same for every reference, so
+    it is scanned once and each entry is then built by concatenation.
+    The final pair carries the trailing literal and ``None``.
+    """
+    ops = []
+    pos = 0
+    for match in _PLACEHOLDER_RE.finditer(template):
+        ops.append((template[pos:match.start()], match.group(1)))
+        pos = match.end()
+    ops.append((template[pos:], None))
+    return tuple(ops)
+
+
 def format_reference(fields: dict, template: str, number: int) -> str:
     """Apply *template* to *fields*, substituting placeholders.
 
@@ -173,29 +241,30 @@ def format_reference(fields: dict, template: str, number: int) -> str:
     Missing fields are replaced with empty strings and extraneous
     punctuation around them is cleaned up.
     """
-    replacements = {
-        "num": str(number),
-        "authors": fields.get("authors", ""),
-        "year": fields.get("year", ""),
-        "title": fields.get("title", ""),
-        "journal": fields.get("journal", ""),
-        "volume": fields.get("volume", ""),
-        "issue": fields.get("issue", ""),
-        "pages": fields.get("pages", ""),
-        "doi": fields.get("doi", ""),
-    }
-
-    result = template
-    for key, value in replacements.items():
-        result = result.replace("{" + key + "}", value)
+    # Anything that is not a known placeholder (including literal braces)
+    # stays in the literals as written.
+    parts = []
+    for literal, name in _compile_template(template):
+        parts.append(literal)
+        if name == "num":
+            parts.append(str(number))
+        elif name is not None:
+            parts.append(fields.get(name, ""))
+    result = "".join(parts)
 
     # Clean up artefacts from empty fields: collapse multiple commas /
-    # periods, empty parentheses, leading/trailing whitespace.
-    result = re.sub(r'\(\)', '', result)           # empty parens
-    result = re.sub(r',\s*,', ',', result)         # double commas
-    result = re.sub(r'\.\s*\.', '.', result)       # double periods
-    result = re.sub(r',\s*\.', '.', result)        # comma before period
-    result = re.sub(r'\s{2,}', ' ', result)        # collapse whitespace
+    # periods, empty parentheses, leading/trailing whitespace.  The passes
+    # run in order (each one can expose work for the next), but the ones
+    # whose trigger characters are absent are skipped outright.
+    if "()" in result:
+        result = _EMPTY_PAREN_RE.sub('', result)   # empty parens
+    has_comma = "," in result
+    if has_comma:
+        result = _DOUBLE_COMMA_RE.sub(',', result)  # double commas
+    result = _DOUBLE_PERIOD_RE.sub('.', result)    # double periods
+    if has_comma:
+        result = _COMMA_PERIOD_RE.sub('.', result)  # comma before period
+    result = _WS_COLLAPSE_RE.sub(' ', result)      # collapse whitespace
     result = result.strip().rstrip(",").strip()
 
     return result
@@ -205,7 +274,7 @@ def format_reference(fields: dict, template: str, number: int) -> str:
 # Main entry-point
 # ---------------------------------------------------------------------------
 
-def apply_references(doc, config: dict) -> dict:
+def apply_references(doc, config: dict, ctx: FormatterContext | None = None) -> dict:
     """Parse and reformat the reference list according to journal style.
 
     Args:
@@ -213,6 +282,7 @@ def apply_references(doc, config: dict) -> dict:
         config: Journal configuration dict.  Must contain
             ``config["reference_style"]`` with keys ``numbering``,
             ``format``, ``hanging_indent``, and ``font_size``.
+        ctx: Shared ``FormatterContext``; built from *doc* when omitted.
 
     Returns:
         A dict with ``"warnings"`` (list[str]) and ``"stats"`` (dict).
@@ -227,11 +297,16 @@ def apply_references(doc, config: dict) -> dict:
         "{authors} ({year}). {title}. {journal}, {volume}({issue}), {pages}. {doi}",
     )
     hanging_indent = ref_config.get("hanging_indent", 0.5)
+    indent = Inches(hanging_indent)
     font_size = ref_config.get("font_size", 10.0)
-    font_size_pt = Pt(font_size)
+    size_half_points = _half_points(Pt(font_size))
+
+    if ctx is None:
+        ctx = FormatterContext.from_document(doc)
+    paragraphs = ctx.paragraphs
 
     # Step 1 — find the references section.
-    section_range = find_references_section(doc)
+    section_range = find_references_section(doc, paragraphs, ctx.style_names)
     if section_range is None:
         warnings.append(
             "Could not locate a References / Bibliography section heading. "
@@ -243,30 +318,32 @@ def apply_references(doc, config: dict) -> dict:
     # Actual entries begin one paragraph after the heading.
     entry_start = ref_start + 1
 
-    paragraphs = doc.paragraphs
     references_found = 0
     references_reformatted = 0
+    unparsed_dropped = 0
     number = 1
 
-    for idx in range(entry_start, ref_end):
-        para = paragraphs[idx]
+    for para in paragraphs[entry_start:ref_end]:
+        if not _HAS_VISIBLE_TEXT(para._p):
+            continue  # skip blank lines
         text = para.text.strip()
         if not text:
-            continue  # skip blank lines
+            continue
 
         references_found += 1
 
         # Step 2 — parse.
         fields = parse_reference(text)
         if fields is None:
-            warnings.append(
-                f"Could not parse reference (entry #{references_found}): "
-                f"'{text[:80]}{'...' if len(text) > 80 else ''}'. Left unchanged."
-            )
+            if len(warnings) < _MAX_PARSE_WARNINGS:
+                warnings.append(
+                    f"Could not parse reference (entry #{references_found}): "
+                    f"'{text[:80]}{'...' if len(text) > 80 else ''}'. Left unchanged."
+                )
+            else:
+                unparsed_dropped += 1
             # Still apply layout formatting even if we can't parse content.
-            _apply_paragraph_formatting(
-                para, hanging_indent, font_size_pt
-            )
+            _apply_paragraph_formatting(para, indent, size_half_points)
             number += 1
             continue
 
@@ -279,14 +356,20 @@ def apply_references(doc, config: dict) -> dict:
             new_text = f"{number}. {new_text}"
 
         # Replace paragraph text while preserving a single run.
-        _replace_paragraph_text(para, new_text)
+        replace_paragraph_text(para, new_text)
 
         # Step 4 — apply formatting.
-        _apply_paragraph_formatting(para, hanging_indent, font_size_pt)
+        _apply_paragraph_formatting(para, indent, size_half_points)
 
         references_reformatted += 1
         number += 1
 
+    if unparsed_dropped:
+        warnings.append(
+            f"... and {unparsed_dropped} more references could not be parsed "
+            "and were left unchanged."
+        )
+
     stats["references_found"] = references_found
     stats["references_reformatted"] = references_reformatted
 
@@ -297,33 +380,18 @@ def apply_references(doc, config: dict) -> dict:
 # Internal helpers
 # ---------------------------------------------------------------------------
 
-def _replace_paragraph_text(paragraph, new_text: str) -> None:
-    """Replace all text in *paragraph* with *new_text*.
+def _apply_paragraph_formatting(
+    paragraph, indent: Length, size_half_points: str
+) -> None:
+    """Apply hanging indent and font size to a reference paragraph.
 
-    Clears every existing run and writes *new_text* into the first run,
-    preserving its character formatting.
+    *indent* is the hanging indent and *size_half_points* the ``w:sz``
+    value, both converted once by the caller.  The size is written on each
+    run's ``w:rPr`` directly rather than through ``run.font.size``.
     """
-    runs = paragraph.runs
-    if not runs:
-        # No runs — add one.
-        paragraph.add_run(new_text)
-        return
-
-    # Preserve formatting from the first run.
-    first_run = runs[0]
-    first_run.text = new_text
-
-    # Clear remaining runs.
-    for run in runs[1:]:
-        run.text = ""
-
-
-def _apply_paragraph_formatting(paragraph, hanging_indent: float, font_size_pt) -> None:
-    """Apply hanging indent and font size to a reference paragraph."""
     pf = paragraph.paragraph_format
-    indent_val = Inches(hanging_indent)
-    pf.left_indent = indent_val
-    pf.first_line_indent = -indent_val
+    pf.left_indent = indent
+    pf.first_line_indent = -indent
 
-    for run in paragraph.runs:
-        run.font.size = font_size_pt
+    for r in paragraph._p.r_lst:
+        r.get_or_add_rPr().get_or_add_sz().set(_W_VAL, size_half_points)
@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
-from app.core.document_parser import get_all_sections, strip_heading_number
+from app.core.document_parser import (
+    FormatterContext,
+    get_all_sections,
+    strip_heading_number,
+)
 
 
-def apply_section_order(doc, config) -> dict:
+def apply_section_order(doc, config, ctx: FormatterContext | None = None) -> dict:
     """Check that document sections appear in the order specified by config.
 
     Reads ``config["section_order"]`` — an optional list of section heading
@@ -21,6 +25,7 @@ def apply_section_order(doc, config) -> dict:
     Args:
         doc: A python-docx ``Document`` object.
         config: Journal configuration dict.
+        ctx: Shared ``FormatterContext``; built from *doc* when omitted.
 
     Returns:
         dict with ``"warnings"`` (list[str]) and ``"stats"`` (dict).
@@ -31,7 +36,9 @@ def apply_section_order(doc, config) -> dict:
     if not target_order:
         return {"warnings": warnings, "stats": {}}
 
-    sections = get_all_sections(doc)
+    if ctx is None:
+        ctx = FormatterContext.from_document(doc)
+    sections = get_all_sections(doc, ctx.paragraphs, ctx.style_names)
 
     if not sections:
         warnings.append(
@@ -42,13 +49,14 @@ def apply_section_order(doc, config) -> dict:
 
     # Build a normalised lookup: lowercase target name -> original name.
     target_lower = [name.lower() for name in target_order]
+    target_set = frozenset(target_lower)
 
     # Extract the current section headings that match any target name.
     current_headings: list[str] = []
     for section in sections:
-        heading_lower = strip_heading_number(section["heading"]).lower()
-        if heading_lower in target_lower:
-            current_headings.append(strip_heading_number(section["heading"]))
+        heading = strip_heading_number(section["heading"])
+        if heading.lower() in target_set:
+            current_headings.append(heading)
 
     if not current_headings:
         warnings.append(
@@ -60,7 +68,8 @@ def apply_section_order(doc, config) -> dict:
     # Compare ordering of the matched sections against the target.
     current_lower = [h.lower() for h in current_headings]
     # Filter target to only those present in the document.
-    expected_lower = [t for t in target_lower if t in current_lower]
+    current_set = frozenset(current_lower)
+    expected_lower = [t for t in target_lower if t in current_set]
 
     if current_lower == expected_lower:
         return {"warnings": warnings, "stats": {}}
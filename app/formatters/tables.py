@@ -2,14 +2,23 @@
 
 from __future__ import annotations
 
+import functools
 import re
+from copy import deepcopy
 
 from lxml import etree
 from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
 
+from app.core.document_parser import FormatterContext, replace_paragraph_text
 
+
+@functools.lru_cache(maxsize=1024)
 def _int_to_roman(num: int) -> str:
-    """Convert an integer to an uppercase Roman numeral string."""
+    """Convert an integer to an uppercase Roman numeral string.
+
+    Memoised: numbering converts the same small integers for every document.
+    """
     result = []
     for value, numeral in (
         (1000, "M"), (900, "CM"), (500, "D"), (400, "CD"),
@@ -35,6 +44,10 @@ def _format_number(n: int, numbering_format: str) -> str:
 
 _BORDER_SIDES = ("top", "left", "bottom", "right", "insideH", "insideV")
 
+_W_P = qn("w:p")
+_W_TBL_PR = qn("w:tblPr")
+_W_TBL_BORDERS = qn("w:tblBorders")
+
 
 def _make_border_element(val: str, sz: int = 4, space: int = 0,
                          color: str = "000000") -> etree._Element:
@@ -47,24 +60,9 @@ def _make_border_element(val: str, sz: int = 4, space: int = 0,
     return el
 
 
-def _set_table_borders(table, border_style: str) -> None:
-    """Apply *border_style* to *table* via XML manipulation.
-
-    Supported styles:
-        ``"all"``         -- single-line borders on every side and interior.
-        ``"top_bottom"``  -- horizontal borders only (top, bottom, insideH).
-        ``"none"``        -- remove all borders.
-    """
-    tbl = table._tbl
-    tbl_pr = tbl.tblPr
-    if tbl_pr is None:
-        tbl_pr = etree.SubElement(tbl, qn("w:tblPr"))
-
-    # Remove existing tblBorders element if present.
-    for existing in tbl_pr.findall(qn("w:tblBorders")):
-        tbl_pr.remove(existing)
-
-    borders_el = etree.SubElement(tbl_pr, qn("w:tblBorders"))
+def _build_borders_element(border_style: str) -> etree._Element:
+    """Build a detached ``w:tblBorders`` element for *border_style*."""
+    borders_el = etree.Element(_W_TBL_BORDERS)
 
     if border_style == "all":
         for side in _BORDER_SIDES:
@@ -96,6 +94,40 @@ def _set_table_borders(table, border_style: str) -> None:
             child.set(qn("w:space"), "0")
             child.set(qn("w:color"), "000000")
 
+    return borders_el
+
+
+# Prebuilt ``w:tblBorders`` per supported style, deep-copied onto each table.
+_BORDER_TEMPLATES = {
+    style: _build_borders_element(style) for style in ("all", "top_bottom", "none")
+}
+
+
+def _set_table_borders(table, border_style: str) -> None:
+    """Apply *border_style* to *table* via XML manipulation.
+
+    Supported styles:
+        ``"all"``         -- single-line borders on every side and interior.
+        ``"top_bottom"``  -- horizontal borders only (top, bottom, insideH).
+        ``"none"``        -- remove all borders.
+
+    Any other value leaves an empty ``w:tblBorders`` element.
+    """
+    tbl = table._tbl
+    tbl_pr = tbl.tblPr
+    if tbl_pr is None:
+        tbl_pr = etree.SubElement(tbl, _W_TBL_PR)
+
+    # Remove existing tblBorders element if present.
+    for existing in tbl_pr.findall(_W_TBL_BORDERS):
+        tbl_pr.remove(existing)
+
+    template = _BORDER_TEMPLATES.get(border_style)
+    if template is None:
+        etree.SubElement(tbl_pr, _W_TBL_BORDERS)
+    else:
+        tbl_pr.append(deepcopy(template))
+
 
 # ---------------------------------------------------------------------------
 # Caption helpers
@@ -108,15 +140,26 @@ _CAPTION_RE = re.compile(
 )
 
 
-def _find_caption_for_table(doc, table, paragraphs_index_map):
+def _is_caption(text: str) -> bool:
+    """Return whether *text* starts with a table label.
+
+    A plain prefix test rejects ordinary paragraphs before the
+    case-insensitive regex runs.
+    """
+    text = text.strip()
+    return text[:5].lower() == "table" and _CAPTION_RE.match(text) is not None
+
+
+def _find_caption_for_table(table):
     """Return ``(paragraph, position)`` for the caption of *table*.
 
     *position* is ``"above"`` or ``"below"`` depending on where the caption
     paragraph sits relative to the table element in the document XML.
+    Only the table's two sibling elements are looked at, so they are
+    wrapped as paragraphs directly.
 
     Returns ``(None, None)`` if no caption is found.
     """
-    body = doc.element.body
     tbl_element = table._tbl
 
     # Get the element just before and just after the table in the body.
@@ -124,15 +167,15 @@ def _find_caption_for_table(doc, table, paragraphs_index_map):
     next_element = tbl_element.getnext()
 
     # Check above first.
-    if prev_element is not None and prev_element in paragraphs_index_map:
-        para = paragraphs_index_map[prev_element]
-        if _CAPTION_RE.match(para.text.strip()):
+    if prev_element is not None and prev_element.tag == _W_P:
+        para = Paragraph(prev_element, table._parent)
+        if _is_caption(para.text):
             return para, "above"
 
     # Check below.
-    if next_element is not None and next_element in paragraphs_index_map:
-        para = paragraphs_index_map[next_element]
-        if _CAPTION_RE.match(para.text.strip()):
+    if next_element is not None and next_element.tag == _W_P:
+        para = Paragraph(next_element, table._parent)
+        if _is_caption(para.text):
             return para, "below"
 
     return None, None
@@ -154,7 +197,7 @@ def _reformat_caption_text(text: str, prefix: str, number: int,
 # Public API
 # ---------------------------------------------------------------------------
 
-def apply_tables(doc, config) -> dict:
+def apply_tables(doc, config, ctx: FormatterContext | None = None) -> dict:
     """Apply table formatting to all tables in *doc*.
 
     Reads ``config["tables"]`` with keys:
@@ -166,6 +209,9 @@ def apply_tables(doc, config) -> dict:
     Args:
         doc: A python-docx ``Document`` object.
         config: Journal configuration dict.
+        ctx: Shared ``FormatterContext``.  Accepted for the formatter
+            contract but not needed: captions are read from each table's
+            sibling elements.
 
     Returns:
         dict with ``"warnings"`` (list[str]) and ``"stats"`` (dict).
@@ -180,10 +226,6 @@ def apply_tables(doc, config) -> dict:
 
     tables = doc.tables
 
-    # Build a map from paragraph XML element -> paragraph object for quick
-    # lookup when searching for captions adjacent to tables.
-    paragraphs_index_map = {para._element: para for para in doc.paragraphs}
-
     table_number = 0
 
     for table in tables:
@@ -193,30 +235,14 @@ def apply_tables(doc, config) -> dict:
         _set_table_borders(table, border_style)
 
         # --- Caption ---
-        caption_para, current_position = _find_caption_for_table(
-            doc, table, paragraphs_index_map
-        )
+        caption_para, current_position = _find_caption_for_table(table)
 
         if caption_para is not None:
-            # Reformat caption text in first run (or paragraph text).
+            # Reformat caption text into a single run.
             new_text = _reformat_caption_text(
                 caption_para.text, prefix, table_number, numbering_format
             )
-            if caption_para.runs:
-                # Replace text across runs: put reformatted text in the first
-                # run and clear subsequent runs that were part of the label.
-                caption_para.runs[0].text = new_text[
-                    : len(new_text) - len(caption_para.text) + len(caption_para.runs[0].text)
-                ] if len(caption_para.runs) > 1 else new_text
-                if len(caption_para.runs) == 1:
-                    caption_para.runs[0].text = new_text
-                else:
-                    # Simpler approach: rebuild via full paragraph text.
-                    caption_para.runs[0].text = new_text
-                    for run in caption_para.runs[1:]:
-                        run.text = ""
-            else:
-                caption_para.text = new_text
+            replace_paragraph_text(caption_para, new_text)
 
             # Warn if position doesn't match.
             if current_position != caption_position:
@@ -6,11 +6,11 @@ NOTE: Abstract and keywords formatting are now handled by dedicated formatters
 
 from __future__ import annotations
 
-import re
-
 from docx.shared import Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 
+from app.core.document_parser import FormatterContext
+
 
 ALIGNMENT_MAP = {
     "left": WD_ALIGN_PARAGRAPH.LEFT,
@@ -21,27 +21,39 @@ ALIGNMENT_MAP = {
 
 def _apply_alignment(paragraph, alignment_name: str) -> None:
     """Set *paragraph* alignment from a string like ``"center"`` or ``"left"``."""
-    alignment = ALIGNMENT_MAP.get(alignment_name.lower())
+    # Configs spell these in lower case; only lower-case on a miss.
+    alignment = ALIGNMENT_MAP.get(alignment_name)
+    if alignment is None:
+        alignment = ALIGNMENT_MAP.get(alignment_name.lower())
     if alignment is not None:
         paragraph.paragraph_format.alignment = alignment
 
 
-def _find_title_paragraph(doc):
+def _find_title_paragraph(paragraphs: list, style_names: list[str]):
     """Return the first non-empty paragraph, preferring one with style 'Title'.
 
     Falls back to the first paragraph that has any non-whitespace text.
     """
-    first_nonempty = None
-    for paragraph in doc.paragraphs:
+    rows = zip(paragraphs, style_names)
+
+    for paragraph, style_name in rows:
         if paragraph.text.strip():
-            if paragraph.style.name == "Title":
+            if style_name == "Title":
                 return paragraph
-            if first_nonempty is None:
-                first_nonempty = paragraph
+            first_nonempty = paragraph
+            break
+    else:
+        return None
+
+    # Past the fallback only a non-empty "Title" paragraph can win; the
+    # style names are precomputed, so no other paragraph's text is read.
+    for paragraph, style_name in rows:
+        if style_name == "Title" and paragraph.text.strip():
+            return paragraph
     return first_nonempty
 
 
-def apply_title_page(doc, config) -> dict:
+def apply_title_page(doc, config, ctx: FormatterContext | None = None) -> dict:
     """Apply title page formatting (title, authors, affiliation).
 
     NOTE: Abstract and keywords formatting are now handled by dedicated
@@ -55,17 +67,20 @@ def apply_title_page(doc, config) -> dict:
     Args:
         doc: A python-docx ``Document`` object.
         config: Journal configuration dict.
+        ctx: Shared ``FormatterContext``; built from *doc* when omitted.
 
     Returns:
         dict with ``"warnings"`` (list[str]) and ``"stats"`` (dict).
     """
+    if ctx is None:
+        ctx = FormatterContext.from_document(doc)
     warnings: list[str] = []
 
     # ------------------------------------------------------------------
     # Title
     # ------------------------------------------------------------------
     title_config = config.get("title_page", {}).get("title", {})
-    title_para = _find_title_paragraph(doc)
+    title_para = _find_title_paragraph(ctx.paragraphs, ctx.style_names)
 
     if title_para is not None:
         font_size = title_config.get("font_size", 14.0)
@@ -73,14 +88,22 @@ def apply_title_page(doc, config) -> dict:
         alignment = title_config.get("alignment", "center")
         all_caps = title_config.get("all_caps", False)
 
+        runs = title_para.runs
         if all_caps:
-            if title_para.runs:
-                for run in title_para.runs:
-                    run.text = run.text.upper()
+            if runs:
+                # Per run, so mixed formatting in the title (e.g. an
+                # italic species name) survives; runs that are already
+                # upper case are not rewritten.
+                for run in runs:
+                    text = run.text
+                    upper = text.upper()
+                    if upper != text:
+                        run.text = upper
             else:
                 title_para.text = title_para.text.upper()
+                runs = title_para.runs
 
-        for run in title_para.runs:
+        for run in runs:
             run.font.size = Pt(font_size)
             run.font.bold = bold
 
@@ -1,21 +1,24 @@
 import asyncio
 import os
-import smtplib
-from email.mime.application import MIMEApplication
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+from email.message import EmailMessage
+
+import aiosmtplib
 
 from config import settings
 
+# MIME type of the formatted output attached to result emails.
+DOCX_MAINTYPE = "application"
+DOCX_SUBTYPE = "vnd.openxmlformats-officedocument.wordprocessingml.document"
+
 
 def _build_message(
     to_email: str,
     original_filename: str,
     output_path: str,
     warnings: list[str],
-) -> MIMEMultipart:
-    """Build a MIME multipart email with the formatted document attached."""
-    msg = MIMEMultipart()
+) -> EmailMessage:
+    """Build an ``EmailMessage`` with the formatted document attached."""
+    msg = EmailMessage()
     msg["From"] = settings.smtp_from
     msg["To"] = to_email
     msg["Subject"] = "Your formatted manuscript is ready"
@@ -29,23 +32,32 @@ def _build_message(
         for warning in warnings:
             body_lines.append(f"  - {warning}")
 
-    msg.attach(MIMEText("\n".join(body_lines), "plain"))
+    msg.set_content("\n".join(body_lines))
 
     basename = os.path.basename(output_path)
     with open(output_path, "rb") as f:
-        attachment = MIMEApplication(f.read(), Name=basename)
-    attachment["Content-Disposition"] = f'attachment; filename="{basename}"'
-    msg.attach(attachment)
+        msg.add_attachment(
+            f.read(),
+            maintype=DOCX_MAINTYPE,
+            subtype=DOCX_SUBTYPE,
+            filename=basename,
+        )
 
     return msg
 
 
-def _send_smtp(msg: MIMEMultipart, to_email: str) -> None:
-    """Send the message via SMTP with STARTTLS."""
-    with smtplib.SMTP(settings.smtp_host, settings.smtp_port) as server:
-        server.starttls()
-        server.login(settings.smtp_user, settings.smtp_password)
-        server.sendmail(settings.smtp_from, to_email, msg.as_string())
+async def _send_smtp(msg: EmailMessage, to_email: str) -> None:
+    """Send the message via SMTP with STARTTLS on the event loop."""
+    await aiosmtplib.send(
+        msg,
+        sender=settings.smtp_from,
+        recipients=[to_email],
+        hostname=settings.smtp_host,
+        port=settings.smtp_port,
+        username=settings.smtp_user,
+        password=settings.smtp_password,
+        start_tls=True,
+    )
 
 
 async def send_formatted_document(
@@ -57,9 +69,12 @@ async def send_formatted_document(
     """Send an email with the formatted document as an attachment.
 
     The email includes the original filename and any formatting warnings.
-    SMTP operations are run in an executor to avoid blocking the event loop.
-    Raises HTTPException(500) on any failure.
+    Building the message (which reads the attachment) runs in a worker
+    thread; the SMTP exchange runs on the event loop via aiosmtplib.
+    Raises ``aiosmtplib.SMTPException`` if the SMTP exchange fails and
+    ``OSError`` if the attachment cannot be read or the connection fails.
     """
-    msg = _build_message(to_email, original_filename, output_path, warnings)
-    loop = asyncio.get_event_loop()
-    await loop.run_in_executor(None, _send_smtp, msg, to_email)
+    msg = await asyncio.to_thread(
+        _build_message, to_email, original_filename, output_path, warnings
+    )
+    await _send_smtp(msg, to_email)
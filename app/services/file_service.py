@@ -1,11 +1,22 @@
 import os
 import uuid
 
+import aiofiles
 from fastapi import HTTPException, UploadFile
 
 from config import settings
 
-ALLOWED_EXTENSIONS = {".doc", ".docx"}
+ALLOWED_EXTENSIONS = frozenset({".doc", ".docx"})
+
+# Read/write size when streaming uploads to disk (64 KiB).
+UPLOAD_CHUNK_SIZE = 1 << 16
+
+# Leading bytes of the two accepted containers: ZIP (.docx) and OLE2 (.doc).
+FILE_SIGNATURES = (b"PK\x03\x04", b"\xd0\xcf\x11\xe0")
+
+# Path separators and characters Windows forbids in filenames, mapped to
+# "_" when deriving output names from client-supplied filenames.
+_FILENAME_UNSAFE = str.maketrans(dict.fromkeys('/\\:*?"<>|', "_"))
 
 
 def get_upload_path(filename: str) -> str:
@@ -16,18 +27,50 @@ def get_upload_path(filename: str) -> str:
 
 
 def get_output_path(original_filename: str) -> str:
-    """Generate an output path in the output directory with a '_formatted' suffix."""
-    name, ext = os.path.splitext(original_filename)
-    formatted_name = f"{name}_formatted{ext}"
+    """Generate an output path in the output directory with a '_formatted' suffix.
+
+    The name is sanitised and carries a short random tag, so uploads that
+    share a filename never write to (or download) each other's output.
+    """
+    name, ext = os.path.splitext(original_filename.translate(_FILENAME_UNSAFE))
+    formatted_name = f"{name}_{uuid.uuid4().hex[:8]}_formatted{ext}"
     return os.path.join(settings.output_dir, formatted_name)
 
 
+async def validate_upload(file: UploadFile) -> None:
+    """Cheaply reject uploads that are too large or not Word documents.
+
+    Checks the size Starlette recorded while spooling the upload against
+    ``settings.max_file_size_mb`` and the first bytes against the ZIP/OLE2
+    signatures, so bad inputs never reach disk or the pipeline.
+    Raises HTTPException(413) for oversized files and HTTPException(400)
+    for unrecognised content.
+    """
+    max_bytes = settings.max_file_size_mb * 1024 * 1024
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File exceeds the {settings.max_file_size_mb} MB size limit.",
+        )
+
+    header = await file.read(4)
+    await file.seek(0)
+    if header not in FILE_SIGNATURES:
+        raise HTTPException(
+            status_code=400,
+            detail="File does not appear to be a valid .doc or .docx document.",
+        )
+
+
 async def save_upload(file: UploadFile) -> str:
     """Save an uploaded file to the uploads directory with a UUID filename.
 
+    The upload is streamed to disk in ``UPLOAD_CHUNK_SIZE`` chunks.
     Validates that the file extension is .doc or .docx.
     Returns the path to the saved file.
-    Raises HTTPException(400) for invalid extensions.
+    Raises HTTPException(400) for invalid extensions and HTTPException(413)
+    if more than ``settings.max_file_size_mb`` is streamed (for uploads
+    whose size was not known up front).
     """
     ext = os.path.splitext(file.filename)[1].lower()
     if ext not in ALLOWED_EXTENSIONS:
@@ -36,13 +79,24 @@ async def save_upload(file: UploadFile) -> str:
             detail=f"Invalid file extension '{ext}'. Only .doc and .docx files are allowed.",
         )
 
-    os.makedirs(settings.upload_dir, exist_ok=True)
-
     dest_path = get_upload_path(file.filename)
-    content = await file.read()
-
-    with open(dest_path, "wb") as f:
-        f.write(content)
+    max_bytes = settings.max_file_size_mb * 1024 * 1024
+    written = 0
+
+    # Stream in fixed-size chunks so the whole upload is never held in memory.
+    async with aiofiles.open(dest_path, "wb") as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            written += len(chunk)
+            if written > max_bytes:
+                break
+            await f.write(chunk)
+
+    if written > max_bytes:
+        cleanup_files(dest_path)
+        raise HTTPException(
+            status_code=413,
+            detail=f"File exceeds the {settings.max_file_size_mb} MB size limit.",
+        )
 
     return dest_path
 
@@ -8,9 +8,14 @@ class Settings(BaseSettings):
     smtp_user: str = ""
     smtp_password: str = ""
     smtp_from: str = ""
+    enable_email: bool = False
     upload_dir: str = "uploads"
     output_dir: str = "output"
     max_file_size_mb: int = 50
+    template_auto_reload: bool = False
+    use_unoserver: bool = False
+    unoserver_host: str = "127.0.0.1"
+    unoserver_port: int = 2003
     journal_config_dir: str = str(Path(__file__).parent / "app" / "journal_configs")
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -5,11 +6,40 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from config import settings
-from app.api.routes import router
+from app.api.routes import STATIC_DIR, router, templates
+from app.core.doc_converter import start_listener, stop_listener
 
-app = FastAPI(title="Manuscript Formatter")
 
-app.mount("/static", StaticFiles(directory=Path(__file__).parent / "app" / "static"), name="static")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep one LibreOffice instance warm for .doc conversions
+    if settings.use_unoserver:
+        start_listener()
+    # Compile every template now so the first page load doesn't pay for it
+    for name in templates.env.list_templates():
+        templates.env.get_template(name)
+    yield
+    stop_listener()
+
+
+class VersionedStaticFiles(StaticFiles):
+    """Static files served with a far-future ``Cache-Control`` header.
+
+    Templates reference assets with a ``?v=`` content hash (see
+    ``STATIC_VERSION``), so a changed file gets a new URL.  With template
+    auto-reload on (development), assets keep the default revalidation.
+    """
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        if not settings.template_auto_reload:
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+app = FastAPI(title="Manuscript Formatter", lifespan=lifespan)
+
+app.mount("/static", VersionedStaticFiles(directory=STATIC_DIR), name="static")
 app.include_router(router)
 
 # Ensure upload/output dirs exist